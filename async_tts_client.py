@@ -0,0 +1,281 @@
+# 基于 asyncio 的 F5-TTS / E2TTS 客户端（不依赖 Tk）
+# 上传参考音频、提交任务、流式读取结果、下载音频都在同一个事件循环中完成，每个服务器用信号量限制同时进行的任务数，
+# 大量块可以同时在途，而不必每块占用一个线程。
+# SyncTTSClient 在后台线程中运行事件循环，供 Tk 按钮等同步代码调用。
+#
+# 无界面批量使用示例：
+#   client = SyncTTSClient(max_per_server=8)
+#   jobs = [(server, build_data(chunk)) for chunk in chunks]
+#   results = client.synthesize_many(jobs)   # [(wav_path, 转写文本) 或异常, ...]，与 jobs 顺序一致
+#   client.close()
+
+import asyncio
+import concurrent.futures
+import json
+import os
+import random
+import string
+import tempfile
+import threading
+import time
+
+# aiohttp 为可选依赖
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from tts_http import SessionPool, ServerEventError, TERMINAL_EVENTS, is_terminal_message
+
+DEFAULT_API = "/gradio_api/call/basic_tts"
+
+
+def _file_data(path):
+    return {"path": path, "meta": {"_type": "gradio.FileData"}}
+
+
+def _remove_result_file(result):
+    """丢弃 synthesize 的结果时删除已下载的临时文件"""
+    try:
+        os.remove(result[0])
+    except OSError:
+        pass
+
+
+def _absolute_audio_url(server, url):
+    if url.startswith(("http://", "https://")):
+        return url
+    if '\\' in url or url.startswith('C:'):
+        # Windows 路径
+        return f"{server}/gradio_api/file={url}"
+    if url.startswith('/'):
+        return f"{server}{url}"
+    return url
+
+
+def parse_result_event(event, data, server):
+    """
+    解析一条结果事件：event 为事件名（逐行 JSON 格式时为 None），data 为 data 行内容
+    返回 (audio_url, 转写文本)，不含结果时返回 (None, None)
+    """
+    try:
+        payload = json.loads(data)
+    except ValueError:
+        return None, None
+    if isinstance(payload, dict) and payload.get("msg") == "process_completed":
+        payload = payload.get("output", {}).get("data", [])
+    elif event != "complete":
+        return None, None
+    if not isinstance(payload, list) or not payload or not isinstance(payload[0], dict):
+        return None, None
+    audio_url = payload[0].get("url") or payload[0].get("path")
+    if audio_url:
+        audio_url = _absolute_audio_url(server, audio_url)
+    transcript = payload[2].strip() if len(payload) >= 3 and isinstance(payload[2], str) else None
+    return audio_url, transcript
+
+
+class AsyncTTSClient:
+    """
+    max_per_server: 每个服务器同时进行的任务数（上传 + 提交 + 等待结果 + 下载）
+    timeout: 单个任务从提交到拿到结果的最长等待（秒）
+    read_timeout: 结果流两次收到数据之间的最长等待（秒）
+    poll_interval: 服务器不支持流式时的轮询间隔（秒）
+    """
+
+    def __init__(self, max_per_server=8, timeout=600, connect_timeout=30, read_timeout=60, poll_interval=2.0):
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("需要安装 aiohttp 才能使用异步 TTS 客户端。\n请运行: pip install aiohttp")
+        self.max_per_server = max_per_server
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.poll_interval = poll_interval
+        self._session = None
+        self._semaphores = {}
+
+    def _get_session(self):
+        # 会话必须在事件循环中创建
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=0, limit_per_host=self.max_per_server),
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=self.connect_timeout,
+                                              sock_read=self.read_timeout))
+        return self._session
+
+    def _semaphore(self, server):
+        key = SessionPool.server_key(server)
+        sem = self._semaphores.get(key)
+        if sem is None:
+            sem = self._semaphores[key] = asyncio.Semaphore(self.max_per_server)
+        return sem
+
+    async def upload(self, server, local_path):
+        """上传本地参考音频，返回 gradio.FileData 结构"""
+        upload_id = ''.join(random.choices(string.ascii_lowercase + string.digits, k=11))
+        mime = 'audio/mpeg' if local_path.lower().endswith('.mp3') else 'audio/wav'
+        with open(local_path, 'rb') as fh:
+            form = aiohttp.FormData()
+            form.add_field('files', fh, filename=os.path.basename(local_path), content_type=mime)
+            async with self._get_session().post(f"{server}/gradio_api/upload?upload_id={upload_id}", data=form) as resp:
+                resp.raise_for_status()
+                data = await resp.json(content_type=None)
+        if isinstance(data, list) and data and isinstance(data[0], str):
+            return _file_data(data[0].strip('"\''))
+        if isinstance(data, dict) and data.get('files'):
+            first = data['files'][0]
+            if isinstance(first, dict) and (first.get('path') or first.get('filepath')):
+                return _file_data(first.get('path') or first.get('filepath'))
+        raise RuntimeError(f"无法解析上传响应: {str(data)[:200]}")
+
+    async def submit(self, server, data, api=DEFAULT_API):
+        """提交生成任务，返回 event_id"""
+        async with self._get_session().post(f"{server}{api}", json={"data": data}) as resp:
+            resp.raise_for_status()
+            j = await resp.json(content_type=None)
+        event_id = None
+        if isinstance(j, dict):
+            event_id = j.get("event_id") or j.get("eventId") or j.get("event")
+        if not event_id:
+            raise RuntimeError("未获取到事件ID(event_id)")
+        return event_id
+
+    async def wait_result(self, server, event_id, api=DEFAULT_API):
+        """流式读取结果事件，收到结束事件立即返回 (audio_url, 转写文本)；服务器不支持流式时按 poll_interval 轮询"""
+        url = f"{server}{api}/{event_id}"
+        while True:
+            event = None
+            async with self._get_session().get(url) as resp:
+                resp.raise_for_status()
+                async for raw in resp.content:
+                    line = raw.decode("utf-8", errors="replace").strip()
+                    if line.startswith("event:"):
+                        event = line[6:].strip()
+                        continue
+                    if not line:
+                        event = None
+                        continue
+                    data = line[5:].strip() if line.startswith("data:") else line
+                    if event == "error":
+                        raise ServerEventError(data)
+                    audio_url, transcript = parse_result_event(event, data, server)
+                    if audio_url:
+                        return audio_url, transcript
+                    if event in TERMINAL_EVENTS or is_terminal_message(data):
+                        raise RuntimeError("未获取到音频结果")
+            await asyncio.sleep(self.poll_interval)
+
+    async def download(self, url, path=None):
+        """下载音频到 path（默认新建临时文件），返回文件路径"""
+        async with self._get_session().get(url) as resp:
+            resp.raise_for_status()
+            content = await resp.read()
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="f5tts_chunk_", suffix=".wav")
+            os.close(fd)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    async def synthesize(self, server, data, api=DEFAULT_API):
+        """
+        完整流程：data[0] 为本地文件路径时先上传，然后提交、等待结果、下载
+        返回 (wav 临时文件路径, 服务器返回的转写文本或 None)
+        """
+        server = server.rstrip('/')
+        data = list(data)
+        async with self._semaphore(server):
+            if isinstance(data[0], str) and os.path.isfile(data[0]):
+                data[0] = await self.upload(server, data[0])
+            event_id = await self.submit(server, data, api)
+            try:
+                audio_url, transcript = await asyncio.wait_for(self.wait_result(server, event_id, api), self.timeout)
+            except asyncio.TimeoutError:
+                raise RuntimeError(f"等待生成结果超时（{self.timeout} 秒）")
+            return await self.download(audio_url), transcript
+
+    async def synthesize_many(self, jobs, api=DEFAULT_API):
+        """jobs: [(server, data), ...]；全部同时提交，结果与 jobs 顺序一致，失败的任务对应位置为异常对象"""
+        return await asyncio.gather(*(self.synthesize(server, data, api) for server, data in jobs),
+                                    return_exceptions=True)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+class SyncTTSClient:
+    """在后台线程中运行事件循环的同步适配器；各方法可在任意线程中调用，阻塞直到结果返回"""
+
+    def __init__(self, **kwargs):
+        self.client = AsyncTTSClient(**kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="tts-event-loop", daemon=True)
+        self._thread.start()
+
+    def run_coroutine(self, coro, discard=None):
+        """
+        把协程交给后台事件循环，返回 concurrent.futures.Future；取消 Future 时取消后台的协程
+        discard: 协程已经完成、但 Future 先被取消而结果无人接收时调用 discard(结果)（如删除已下载的文件）
+        """
+        if discard is None:
+            return asyncio.run_coroutine_threadsafe(coro, self._loop)
+        future = concurrent.futures.Future()
+
+        def finish(task):
+            if task.cancelled():
+                future.cancel()
+                return
+            exc = task.exception()
+            # Future 已被取消时 set_running_or_notify_cancel 返回 False，结果不会再交给调用方
+            if not future.set_running_or_notify_cancel():
+                if exc is None:
+                    discard(task.result())
+            elif exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(task.result())
+
+        def start():
+            if future.cancelled():
+                coro.close()
+                return
+            task = self._loop.create_task(coro)
+            task.add_done_callback(finish)
+            future.add_done_callback(lambda f: f.cancelled() and self._loop.call_soon_threadsafe(task.cancel))
+
+        self._loop.call_soon_threadsafe(start)
+        return future
+
+    def synthesize(self, server, data, api=DEFAULT_API, timeout=None, cancel=None):
+        """
+        cancel: threading.Event，设置后取消后台的协程（停止等待结果）并抛出 concurrent.futures.CancelledError；
+        取消时音频已经下载完的，删除下载的临时文件
+        """
+        future = self.run_coroutine(self.client.synthesize(server, data, api), discard=_remove_result_file)
+        if cancel is None:
+            return future.result(timeout)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = 0.5 if deadline is None else max(0.0, min(0.5, deadline - time.monotonic()))
+            try:
+                return future.result(wait)
+            except concurrent.futures.TimeoutError:
+                if cancel.is_set() and future.cancel():
+                    raise concurrent.futures.CancelledError()
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise
+
+    def synthesize_many(self, jobs, api=DEFAULT_API, timeout=None):
+        return self.run_coroutine(self.client.synthesize_many(jobs, api)).result(timeout)
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        try:
+            self.run_coroutine(self.client.close()).result(10)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(10)
+            self._loop.close()
@@ -0,0 +1,128 @@
+# 边生成边播放：按块序号顺序在本地播放已生成的音频块（不依赖 Tk）
+# 块可能乱序完成，播放器只在下一块就绪后才播放；播放在独立线程中进行，不阻塞生成。
+
+import os
+import shutil
+import threading
+import time
+
+# Windows 自带 winsound，可直接播放 WAV
+try:
+    import winsound
+    WINSOUND_AVAILABLE = True
+except ImportError:
+    WINSOUND_AVAILABLE = False
+
+# 其他平台尝试 pydub 的播放功能（需要 simpleaudio、pyaudio 或 ffplay 之一）
+try:
+    from pydub import AudioSegment
+    from pydub.playback import play as pydub_play
+    PYDUB_AVAILABLE = True
+except ImportError:
+    PYDUB_AVAILABLE = False
+
+
+def _pydub_backend_available():
+    """按 pydub.playback.play 的顺序查找实际能用的播放后端：simpleaudio、pyaudio、PATH 中的 ffplay/avplay"""
+    for module in ("simpleaudio", "pyaudio"):
+        try:
+            __import__(module)
+            return True
+        except ImportError:
+            pass
+    return bool(shutil.which("ffplay") or shutil.which("avplay"))
+
+
+# 只装了 pydub 而没有任何后端时，pydub 会在播放时才调用不存在的 ffplay 而失败
+PYDUB_PLAYBACK_AVAILABLE = PYDUB_AVAILABLE and _pydub_backend_available()
+
+
+def playback_available():
+    return WINSOUND_AVAILABLE or PYDUB_PLAYBACK_AVAILABLE
+
+
+def play_wav(path):
+    """阻塞播放一个 WAV 文件，直到播放结束"""
+    if WINSOUND_AVAILABLE:
+        winsound.PlaySound(path, winsound.SND_FILENAME)
+    elif PYDUB_PLAYBACK_AVAILABLE:
+        pydub_play(AudioSegment.from_wav(path))
+    else:
+        raise RuntimeError("没有可用的本地播放方式。\n请运行: pip install simpleaudio")
+
+
+class ChunkPlayer:
+    """
+    started_at: 本次生成开始的 time.perf_counter()，用于计算首段音频用时
+    on_first_audio: 第一块开始播放时调用 on_first_audio(秒数)（在播放线程中调用）
+    log: 日志函数
+    """
+
+    def __init__(self, started_at=None, on_first_audio=None, log=None):
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.on_first_audio = on_first_audio
+        self.log = log or (lambda msg: None)
+        self.time_to_first_audio = None
+        self._cond = threading.Condition()
+        self._ready = {}
+        self._next = 0
+        self._closed = False
+        self._stopped = False
+        self._cleanup = []
+        self._thread = None
+
+    def add(self, index, path):
+        """第 index 块（从0开始）已生成，可以播放"""
+        with self._cond:
+            if self._closed:
+                return
+            self._ready[index] = path
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def close(self, cleanup_paths=(), stop=False):
+        """
+        不会再有新的块；播放完已就绪的块后删除 cleanup_paths（块的临时文件）
+        stop=True 时不再播放尚未开始的块（当前正在播放的块会播完）
+        """
+        with self._cond:
+            self._closed = True
+            self._stopped = self._stopped or stop
+            self._cleanup.extend(cleanup_paths)
+            running = self._thread is not None
+            self._cond.notify()
+        if not running:
+            self._remove_files()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and self._next not in self._ready and not self._closed:
+                    self._cond.wait()
+                if self._stopped or self._next not in self._ready:
+                    # 已停止，或已关闭且下一块不会再到来
+                    break
+                index = self._next
+                path = self._ready.pop(index)
+                self._next += 1
+            if index == 0:
+                self.time_to_first_audio = time.perf_counter() - self.started_at
+                if self.on_first_audio:
+                    self.on_first_audio(self.time_to_first_audio)
+            try:
+                play_wav(path)
+            except Exception as e:
+                self.log(f"[PLAYER][ERROR] 播放第 {index + 1} 块失败: {e}")
+        self._remove_files()
+
+    def _remove_files(self):
+        with self._cond:
+            paths, self._cleanup = self._cleanup, []
+        for path in paths:
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                self.log(f"[PLAYER][WARN] 清理临时文件失败: {path}, 错误: {e}")
@@ -0,0 +1,106 @@
+"""
+数字转英文微基准：对比原递归实现与 number_speller 的查表实现
+
+用法：
+    python benchmarks/bench_number_speller.py [--repeat 5] [--count 200000]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import number_speller  # noqa: E402
+
+# 原 TextFormatter.number_to_words / replace_number 的递归实现，仅作为对照基准
+LEGACY_NUMBER_WORDS = {
+    0: "zero", 1: "one", 2: "two", 3: "three", 4: "four", 5: "five",
+    6: "six", 7: "seven", 8: "eight", 9: "nine", 10: "ten",
+    11: "eleven", 12: "twelve", 13: "thirteen", 14: "fourteen", 15: "fifteen",
+    16: "sixteen", 17: "seventeen", 18: "eighteen", 19: "nineteen",
+    20: "twenty", 30: "thirty", 40: "forty", 50: "fifty",
+    60: "sixty", 70: "seventy", 80: "eighty", 90: "ninety"
+}
+
+
+def legacy_number_to_words(num):
+    if num in LEGACY_NUMBER_WORDS:
+        return LEGACY_NUMBER_WORDS[num]
+    if num < 100:
+        tens = (num // 10) * 10
+        ones = num % 10
+        if ones == 0:
+            return LEGACY_NUMBER_WORDS[tens]
+        return f"{LEGACY_NUMBER_WORDS[tens]}-{LEGACY_NUMBER_WORDS[ones]}"
+    elif num < 1000:
+        hundreds = num // 100
+        remainder = num % 100
+        if remainder == 0:
+            return f"{LEGACY_NUMBER_WORDS[hundreds]} hundred"
+        return f"{LEGACY_NUMBER_WORDS[hundreds]} hundred {legacy_number_to_words(remainder)}"
+    elif num < 1000000:
+        thousands = num // 1000
+        remainder = num % 1000
+        if remainder == 0:
+            return f"{legacy_number_to_words(thousands)} thousand"
+        return f"{legacy_number_to_words(thousands)} thousand {legacy_number_to_words(remainder)}"
+    return str(num)
+
+
+def legacy_convert(num):
+    if 1000 <= num <= 9999:
+        if num < 2000:
+            return f"{legacy_number_to_words(num // 100)} {legacy_number_to_words(num % 100)}"
+        if num % 100 == 0:
+            return "two thousand"
+        return f"two thousand {legacy_number_to_words(num % 100)}"
+    return legacy_number_to_words(num)
+
+
+def table_convert(num):
+    if 1000 <= num <= 9999:
+        return number_speller.year_to_words(num)
+    return number_speller.number_to_words(num)
+
+
+def check_equivalence():
+    """逐一核对 0-999999 的输出，确保查表实现与原实现完全一致"""
+    for num in range(1000000):
+        if legacy_convert(num) != table_convert(num):
+            raise AssertionError(f"输出不一致: {num}: {legacy_convert(num)!r} != {table_convert(num)!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="number_to_words 微基准")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--count", type=int, default=200000, help="每轮转换的数字个数")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--skip-check", action="store_true", help="跳过 0-999999 的逐一一致性核对")
+    args = parser.parse_args()
+
+    if not args.skip_check:
+        check_equivalence()
+        print("一致性核对通过: 0-999999")
+
+    rng = random.Random(args.seed)
+    # 混合分布：年份、小数字、大数字各占一部分，接近真实脚本
+    numbers = [rng.choice((rng.randint(1000, 2099), rng.randint(0, 99), rng.randint(100, 999999)))
+               for _ in range(args.count)]
+
+    def run(fn):
+        def _loop():
+            for n in numbers:
+                fn(n)
+        return min(timeit.repeat(_loop, number=1, repeat=args.repeat))
+
+    legacy = run(legacy_convert)
+    table = run(table_convert)
+    print(f"递归实现: {legacy * 1e9 / args.count:8.1f} ns/次")
+    print(f"查表实现: {table * 1e9 / args.count:8.1f} ns/次")
+    print(f"加速比:   {legacy / table:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
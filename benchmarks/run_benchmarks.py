@@ -0,0 +1,328 @@
+"""
+文本处理流水线基准套件：数字转换、整篇转换（process_text）、实时预览增量更新、TTS 分块、发音词典
+
+用合成语料（固定随机种子，可复现）在不同大小和数字密度下测量：
+吞吐量（ops/s）、单次调用延迟的 p50/p95/p99、峰值内存（tracemalloc）。
+
+用法：
+    python benchmarks/run_benchmarks.py                        # 1KB / 64KB / 1MB
+    python benchmarks/run_benchmarks.py --large                # 另加 10MB / 100MB
+    python benchmarks/run_benchmarks.py --save-baseline        # 写入 benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --compare --threshold 0.15
+    python benchmarks/run_benchmarks.py --only "process_text/dense"
+
+--compare 时，任一项吞吐量下降或峰值内存上升超过阈值即视为退化，退出码为 1。
+基线与机器有关，应在同一台机器上生成和比较。
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import number_speller  # noqa: E402
+import pronunciation_lexicon  # noqa: E402
+import text_normalizer  # noqa: E402
+from preview_worker import plan_line_update  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+SIZES = {"1KB": 1 << 10, "64KB": 64 << 10, "1MB": 1 << 20}
+LARGE_SIZES = {"10MB": 10 << 20, "100MB": 100 << 20}
+
+# 含数字的句子所占比例
+DENSITIES = {"prose": 0.1, "mixed": 0.5, "dense": 0.95}
+
+# 峰值内存的比较忽略小于此值的变化，避免小样本的抖动被当成退化
+MEMORY_SLACK_BYTES = 64 * 1024
+
+
+def _numeric_sentence(rng):
+    kind = rng.randrange(6)
+    if kind == 0:
+        return f"In {rng.randint(1900, 2099)} and again in {rng.randint(1000, 1899)}, sales fell."
+    if kind == 1:
+        return f"She finished {rng.randint(1, 120)}{rng.choice(['st', 'nd', 'rd', 'th'])} out of {rng.randint(100, 9999)}."
+    if kind == 2:
+        return f"The budget was ${rng.randint(1, 999)},{rng.randint(0, 999):03d},{rng.randint(0, 999):03d}.{rng.randint(0, 99):02d}."
+    if kind == 3:
+        return f"Population reached {rng.randint(10 ** 9, 10 ** 15)} by the {rng.randint(1900, 2000)}s."
+    if kind == 4:
+        return f"Rates rose {rng.randint(1, 99)}.{rng.randint(0, 9)}% from {rng.randint(1950, 1990)}-{rng.randint(1991, 2020)}."
+    return f"Doors open at {rng.randint(1, 12)}:{rng.randint(0, 59):02d} in room {rng.randint(1, 999)}."
+
+
+_PROSE = [
+    "The narrator pauses before the next part of the story.",
+    "Nothing numeric happens in this sentence, it is only filler text.",
+    "Listeners often write in to ask about the background music.",
+    "We will come back to that question later in the episode.",
+]
+
+
+def make_corpus(size_bytes, density, seed=1234):
+    """按段落生成英文样本：每段一行（与输入框中的一行对应），段落之间偶尔有空行"""
+    rng = random.Random(seed)
+    lines = []
+    total = 0
+    while total < size_bytes:
+        sentences = [_numeric_sentence(rng) if rng.random() < density else rng.choice(_PROSE)
+                     for _ in range(rng.randint(2, 8))]
+        line = " ".join(sentences)
+        lines.append(line)
+        total += len(line) + 1
+        if rng.random() < 0.3:
+            lines.append("")
+            total += 1
+    return "\n".join(lines)
+
+
+def _percentile(sorted_samples, q):
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(q / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+def measure(op, args, repeat, min_time, units_per_call=1, memory=True):
+    """
+    对 args 中的每个参数调用一次 op 为一轮，至少跑 repeat 轮且总时长不少于 min_time
+    返回 ops/s（每次调用计 units_per_call 个单位，如字节数、数字个数）、每次调用延迟的百分位（微秒）和峰值内存
+    """
+    perf = time.perf_counter
+    samples = []
+    elapsed = 0.0
+    passes = 0
+    while passes < repeat or elapsed < min_time:
+        for arg in args:
+            t0 = perf()
+            op(arg)
+            samples.append(perf() - t0)
+        elapsed = sum(samples)
+        passes += 1
+        if passes >= 1000:
+            break
+    samples.sort()
+    result = {
+        "calls": len(samples),
+        "ops_per_sec": len(samples) * units_per_call / elapsed if elapsed > 0 else float("inf"),
+        "p50_us": _percentile(samples, 50) * 1e6,
+        "p95_us": _percentile(samples, 95) * 1e6,
+        "p99_us": _percentile(samples, 99) * 1e6,
+    }
+    if memory:
+        # 单独跑一轮测峰值内存（tracemalloc 会拖慢执行，不与计时混在一起）；不含语料本身
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        for arg in args:
+            op(arg)
+        result["peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+    return result
+
+
+def bench_number_to_words(rng):
+    """数字转英文：每次调用转换 1000 个数"""
+    ranges = {"small": (0, 999), "year": (1000, 9999), "large": (10 ** 6, 10 ** 18)}
+    for label, (lo, hi) in ranges.items():
+        batches = [[rng.randint(lo, hi) for _ in range(1000)] for _ in range(20)]
+        if label == "year":
+            def op(batch):
+                for n in batch:
+                    text_normalizer.convert_number(str(n))
+        else:
+            def op(batch):
+                for n in batch:
+                    number_speller.number_to_words(n)
+        yield f"number_to_words/{label}", op, batches, 1000, "numbers"
+
+
+def bench_process_text(corpora):
+    """整篇转换：与 process_text 相同，逐行转换；吞吐量按字节计"""
+    for (density, size_label), text in corpora.items():
+        lines = text.split("\n")
+
+        def op(lines_):
+            for line in lines_:
+                text_normalizer.normalize_text(line)
+        yield f"process_text/{density}/{size_label}", op, [lines], len(text), "bytes"
+
+
+def bench_preview(corpora, rng):
+    """
+    实时预览：在随机位置插入一个字符，取全文快照、比对新旧行并只转换变化的行
+    （与后台线程的流程相同；快照在调用内生成，大语料不必预先保存每次编辑后的全文）
+    """
+    for (density, size_label), text in corpora.items():
+        if density != "mixed":
+            continue
+        base_lines = text.split("\n")
+        count = 200 if len(text) <= SIZES["1MB"] else 10
+        edits = []
+        for _ in range(count):
+            pos = rng.randrange(len(text) + 1)
+            edits.append((pos, text.count("\n", 0, pos)))
+
+        def op(edit, text=text, base_lines=base_lines):
+            pos, hint = edit
+            lines = (text[:pos] + "7" + text[pos:]).split("\n")
+            plan = plan_line_update(base_lines, lines, hint)
+            if plan is not None:
+                start, old_end, new_end = plan
+                for line in lines[start:new_end]:
+                    text_normalizer.normalize_text(line)
+        yield f"preview_edit/{size_label}", op, edits, 1, "edits"
+
+
+def bench_chunking(corpora):
+    """TTS 分块：每次调用对整篇文本分块"""
+    for (density, size_label), text in corpora.items():
+        def op(t):
+            text_normalizer.split_text_into_chunks(t, 3000)
+        yield f"chunking/{density}/{size_label}", op, [text], 1, "calls"
+
+
+def bench_lexicon(rng):
+    """
+    发音词典：编译（解析词典文件并构建自动机）与从磁盘缓存内容加载的耗时对比，以及替换的吞吐量
+    缓存内容预先读入内存，只比较解码和重建，不含文件读取
+    """
+    def word():
+        return "".join(rng.choice("abcdefghijklmnopqrstuvwxyzF0123456789") for _ in range(rng.randint(2, 10)))
+
+    for count in (1000, 20000):
+        entries = {}
+        while len(entries) < count:
+            entries[word() if rng.random() < 0.7 else f"{word()} {word()}"] = word()
+        source = "\n".join(f"{k}\t{v}" for k, v in entries.items()).encode("utf-8")
+        cached = pronunciation_lexicon.Lexicon(entries).to_bytes("bench")
+
+        def compile_op(data):
+            pronunciation_lexicon.Lexicon(pronunciation_lexicon.parse_entries(data))
+
+        def load_op(data):
+            pronunciation_lexicon.Lexicon.from_bytes(data, "bench")
+        yield f"lexicon_compile/{count}", compile_op, [source], 1, "loads"
+        yield f"lexicon_cached_load/{count}", load_op, [cached], 1, "loads"
+
+        lexicon = pronunciation_lexicon.Lexicon(entries)
+        keys = list(entries)
+        text = " ".join(rng.choice(keys) if rng.random() < 0.2 else word() for _ in range(20000))
+        yield f"lexicon_apply/{count}", lexicon.apply, [text], len(text), "bytes"
+
+
+def run(sizes, repeat, min_time, seed, only=None, memory=True, log=print):
+    rng = random.Random(seed)
+    corpora = {}
+    for size_label, size in sizes.items():
+        for density, ratio in DENSITIES.items():
+            corpora[(density, size_label)] = make_corpus(size, ratio, seed)
+
+    groups = [
+        bench_number_to_words(rng),
+        bench_process_text(corpora),
+        bench_preview(corpora, rng),
+        bench_chunking(corpora),
+        bench_lexicon(rng),
+    ]
+    pattern = re.compile(only) if only else None
+    results = {}
+    for group in groups:
+        for name, op, args, units, unit_label in group:
+            if pattern and not pattern.search(name):
+                continue
+            result = measure(op, args, repeat, min_time, units, memory)
+            result["unit"] = unit_label
+            results[name] = result
+            log(_format_row(name, result))
+    return results
+
+
+def _format_row(name, r):
+    peak = f"{r['peak_kb']:>10.0f}" if "peak_kb" in r else f"{'-':>10}"
+    return (f"{name:<32} {r['ops_per_sec']:>14.1f} {r['unit']:<8} {r['p50_us']:>10.1f} {r['p95_us']:>10.1f} "
+            f"{r['p99_us']:>10.1f} {peak}")
+
+
+def compare(results, baseline, threshold):
+    """返回退化项列表 [(名称, 说明)]；只比较两边都有的项"""
+    regressions = []
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if cur["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold):
+            regressions.append((name, f"吞吐量 {base['ops_per_sec']:.1f} -> {cur['ops_per_sec']:.1f} ops/s"))
+        if "peak_kb" in cur and "peak_kb" in base:
+            grown = (cur["peak_kb"] - base["peak_kb"]) * 1024
+            if cur["peak_kb"] > base["peak_kb"] * (1 + threshold) and grown > MEMORY_SLACK_BYTES:
+                regressions.append((name, f"峰值内存 {base['peak_kb']:.0f} -> {cur['peak_kb']:.0f} KB"))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="文本处理流水线基准套件")
+    parser.add_argument("--sizes", default=",".join(SIZES), help=f"语料大小，可选 {', '.join(list(SIZES) + list(LARGE_SIZES))}")
+    parser.add_argument("--large", action="store_true", help="另外测试 10MB 和 100MB 语料（耗时较长）")
+    parser.add_argument("--repeat", type=int, default=3, help="每项至少重复的轮数")
+    parser.add_argument("--min-time", type=float, default=0.2, help="每项至少运行的秒数")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--only", default=None, help="只运行名称匹配此正则的项")
+    parser.add_argument("--no-memory", action="store_true", help="不测峰值内存")
+    parser.add_argument("--output", default=None, help="把本次结果写入 JSON 文件")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, default=None,
+                        help="把本次结果保存为基线（默认 benchmarks/baseline.json）")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, default=None,
+                        help="与基线比较，退化超过阈值时退出码为 1")
+    parser.add_argument("--threshold", type=float, default=0.15, help="允许的退化比例，默认 0.15")
+    args = parser.parse_args(argv)
+
+    all_sizes = dict(SIZES, **LARGE_SIZES)
+    labels = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    if args.large:
+        labels += [s for s in LARGE_SIZES if s not in labels]
+    unknown = [s for s in labels if s not in all_sizes]
+    if unknown:
+        parser.error(f"未知的语料大小: {', '.join(unknown)}")
+    sizes = {s: all_sizes[s] for s in labels}
+
+    print(f"{'项目':<32} {'ops/s':>14} {'单位':<8} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10} {'峰值 KB':>10}")
+    results = run(sizes, args.repeat, args.min_time, args.seed, args.only, not args.no_memory)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "sizes": labels,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            print(f"结果已写入: {path}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n发现 {len(regressions)} 项退化（阈值 {args.threshold:.0%}）：")
+            for name, detail in regressions:
+                print(f"  {name}: {detail}")
+            return 1
+        print(f"\n与基线相比没有超过 {args.threshold:.0%} 的退化")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+# 段落级转换结果缓存：相同的段落（开场白、免责声明、固定的日期行等）直接返回上次的结果，不再重新扫描
+# 键为 段落内容 + 转换规则版本 + 发音词典指纹 的哈希；规则或词典变化后旧结果自然失效。
+# 内存中为 LRU；可选的磁盘存储（sqlite）在多次运行、多个进程之间共享，超过容量上限时按最近使用时间淘汰。
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import text_normalizer
+
+
+class ConversionCache:
+    """
+    max_entries: 内存 LRU 的条目数上限
+    db_path: 磁盘存储文件（sqlite），为空时只用内存
+    max_db_bytes: 磁盘存储的容量上限（按键和结果的字节数统计）
+    min_chars: 短于此长度的文本直接转换，不进缓存（哈希和查表的开销不比转换小）
+    """
+
+    # 新结果先攒在内存里，攒够这么多条再用一个短事务批量写入；平时不持有写事务，
+    # 多个进程共享同一个缓存文件时只在批量写入的几毫秒内互相等待
+    COMMIT_EVERY = 256
+    # 命中时更新 last_used 只是为了淘汰顺序，距上次更新不到这么多秒就跳过（命中通常不产生写入）
+    TOUCH_INTERVAL = 3600
+
+    def __init__(self, max_entries=4096, db_path=None, max_db_bytes=64 * 1024 * 1024, min_chars=32):
+        self.max_entries = max_entries
+        self.max_db_bytes = max_db_bytes
+        self.min_chars = min_chars
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()    # key -> (value, 磁盘上记录的 last_used)
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_bytes = 0    # 磁盘存储的总字节数：打开时统计一次，之后随插入和删除增减
+        self._pending = []    # 尚未写入磁盘的 (key, value, size, last_used)
+        self._touched = {}    # 需要更新 last_used 的 key -> 时间
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 预览线程和主线程共用一个连接，访问由 self._lock 串行化
+        # 查询不开启事务；写入只在 _commit 中以短事务批量进行
+        self._db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS conversions ("
+            " key BLOB PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS conversions_last_used ON conversions (last_used)")
+        self._db.commit()
+        # 其他进程的写入不会计入，只影响淘汰时机的早晚
+        self._db_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM conversions").fetchone()[0]
+
+    @staticmethod
+    def make_key(text, lexicon=None):
+        fingerprint = lexicon.fingerprint if lexicon is not None else ""
+        h = hashlib.blake2b(digest_size=20)
+        h.update(f"{text_normalizer.RULES_VERSION}|{fingerprint}|".encode("ascii"))
+        h.update(text.encode("utf-8", "surrogatepass"))
+        return h.digest()
+
+    def convert(self, text, lexicon=None):
+        """返回 normalize_text(text, lexicon) 的结果，命中缓存时不重新扫描"""
+        if len(text) < self.min_chars:
+            return text_normalizer.normalize_text(text, lexicon)
+        key = self.make_key(text, lexicon)
+        value = self.get(key)
+        if value is None:
+            value = text_normalizer.normalize_text(text, lexicon)
+            self.put(key, value)
+        return value
+
+    def get(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                value, last_used = entry
+            elif self._db is not None:
+                row = self._db.execute("SELECT value, last_used FROM conversions WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                value, last_used = row
+            else:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if self._db is not None:
+                now = time.time()
+                if now - last_used > self.TOUCH_INTERVAL:
+                    self._touched[key] = now
+                    last_used = now
+                    if len(self._touched) >= self.COMMIT_EVERY:
+                        self._commit()
+            self._remember(key, value, last_used)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            now = time.time()
+            self._remember(key, value, now)
+            if self._db is not None:
+                self._pending.append((key, value, len(key) + len(value.encode("utf-8", "surrogatepass")), now))
+                if len(self._pending) >= self.COMMIT_EVERY:
+                    self._commit()
+
+    def _remember(self, key, value, last_used):
+        self._memory[key] = (value, last_used)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _commit(self):
+        """把攒下的新结果和 last_used 更新放在一个短事务里写入；缓存是尽力而为的，写入失败（如长时间被锁）时丢弃这批"""
+        rows, self._pending = self._pending, []
+        touched, self._touched = self._touched, {}
+        try:
+            added = 0
+            with self._db:
+                for key, value, size, last_used in rows:
+                    # 键相同则结果相同；已有的行（如其他进程写入的）只更新 last_used，总字节数不变
+                    if self._db.execute("INSERT OR IGNORE INTO conversions (key, value, size, last_used) "
+                                        "VALUES (?, ?, ?, ?)", (key, value, size, last_used)).rowcount:
+                        added += size
+                    else:
+                        touched[key] = last_used
+                self._db.executemany("UPDATE conversions SET last_used = ? WHERE key = ?",
+                                     [(t, key) for key, t in touched.items()])
+            self._db_bytes += added
+            self._evict()
+        except sqlite3.OperationalError:
+            pass
+
+    def _evict(self):
+        """磁盘存储超过上限时，从最久未使用的开始删除，降到上限的 90%"""
+        if self._db_bytes <= self.max_db_bytes:
+            return
+        excess = self._db_bytes - int(self.max_db_bytes * 0.9)
+        doomed = []
+        for key, size in self._db.execute("SELECT key, size FROM conversions ORDER BY last_used"):
+            doomed.append((key, size))
+            excess -= size
+            if excess <= 0:
+                break
+        removed = 0
+        with self._db:
+            for key, size in doomed:
+                if self._db.execute("DELETE FROM conversions WHERE key = ?", (key,)).rowcount:
+                    removed += size
+        self._db_bytes -= removed
+
+    def flush(self):
+        """提交尚未写入磁盘的结果"""
+        with self._lock:
+            if self._db is not None and (self._pending or self._touched):
+                self._commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                if self._pending or self._touched:
+                    self._commit()
+                self._db.close()
+                self._db = None
+
+    def __len__(self):
+        return len(self._memory)
@@ -0,0 +1,143 @@
+# 语速模型（不依赖 Tk）：按朗读时长而不是字符数规划 TTS 分块
+# 每个字符计为若干"朗读单位"（标点停顿、未转换的数字读得更长），
+# 每秒朗读单位数按 服务器 + 模型 + 语速 分别从实际生成的 WAV 时长学习（指数滑动平均），保存在 JSON 文件中。
+# 规划分块用的语速单独冻结，只在学习到的语速偏离超过 PLAN_DRIFT 时才更新，
+# 同一段文本重复生成时分块边界不变（块文本相同才能命中音频缓存、复用上次已生成的块）。
+
+import json
+import os
+import tempfile
+import threading
+import wave
+from itertools import accumulate, chain, repeat
+
+# 尚无样本时的默认语速：英文朗读约 150 词/分钟，按朗读单位约 15 单位/秒（speed=1.0）
+DEFAULT_UNITS_PER_SEC = 15.0
+
+# 每个字符的朗读单位，未列出的字符为 1
+_CHAR_UNITS = {ch: 7 for ch in ".!?"}          # 句末停顿
+_CHAR_UNITS.update({ch: 3 for ch in ",;:—"})  # 句中停顿
+_CHAR_UNITS["\n"] = 5                           # 换行/分段停顿
+_CHAR_UNITS.update({ch: 4 for ch in "0123456789"})  # 未转换的数字，一位约读成一个单词
+
+
+def prefix_units(text):
+    """返回前缀和列表 p，p[j] - p[i] 为 text[i:j] 的朗读单位数（可直接传给 iter_chunk_spans 的 cost）"""
+    return list(accumulate(chain((0,), map(_CHAR_UNITS.get, text, repeat(1)))))
+
+
+def speech_units(text):
+    return sum(map(_CHAR_UNITS.get, text, repeat(1)))
+
+
+def wav_duration(path):
+    """读取 WAV 文件时长（秒），无法解析时返回 None"""
+    try:
+        with wave.open(path, "rb") as w:
+            rate = w.getframerate()
+            return w.getnframes() / rate if rate else None
+    except (OSError, EOFError, wave.Error):
+        return None
+
+
+class SpeechRateModel:
+    """
+    path: 统计数据的 JSON 文件，格式 {"服务器|模型|语速": {"units_per_sec": 15.2, "plan_units_per_sec": 15.0, "samples": 12}}
+    alpha: 指数滑动平均的权重，越大越偏向最近的样本
+    """
+
+    # 过短的音频（停顿占比大）不参与学习
+    MIN_SECONDS = 2.0
+    # 学习到的语速与规划语速相差超过这个比例时，才更新规划语速
+    PLAN_DRIFT = 0.2
+
+    def __init__(self, path=None, alpha=0.3):
+        self.path = path
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._stats = {}
+        if path and os.path.isfile(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self._stats = data
+            except (OSError, ValueError):
+                pass
+
+    @staticmethod
+    def key(server, model, speed):
+        return f"{server.rstrip('/')}|{model}|{float(speed):.1f}"
+
+    def units_per_sec(self, server, model, speed):
+        """
+        返回该 服务器/模型/语速 的朗读速度；没有样本时，用同一服务器和模型其他语速的样本按语速比例换算，
+        仍没有时用默认值
+        """
+        with self._lock:
+            return self._rate_locked(server, model, float(speed), "units_per_sec")
+
+    def plan_units_per_sec(self, server, model, speed):
+        """规划分块用的朗读速度（冻结值，见 PLAN_DRIFT）"""
+        with self._lock:
+            return self._rate_locked(server, model, float(speed), "plan_units_per_sec")
+
+    def _rate_locked(self, server, model, speed, field):
+        entry = self._stats.get(self.key(server, model, speed))
+        if entry:
+            return entry.get(field, entry["units_per_sec"])
+        prefix = f"{server.rstrip('/')}|{model}|"
+        nearest = None
+        for k, v in self._stats.items():
+            if k.startswith(prefix):
+                other = float(k[len(prefix):])
+                if other > 0 and (nearest is None or abs(other - speed) < abs(nearest[0] - speed)):
+                    nearest = (other, v.get(field, v["units_per_sec"]))
+        if nearest:
+            return nearest[1] * speed / nearest[0]
+        return DEFAULT_UNITS_PER_SEC * speed
+
+    def estimate_seconds(self, text, server, model, speed):
+        return speech_units(text) / self.units_per_sec(server, model, speed)
+
+    def max_units(self, target_seconds, server, model, speed):
+        """目标时长对应的朗读单位数上限（按规划语速，语速小幅波动时分块不变）"""
+        return max(1, int(target_seconds * self.plan_units_per_sec(server, model, speed)))
+
+    def observe(self, server, model, speed, text, seconds):
+        """记录一次实际生成：text 生成了 seconds 秒的音频；返回更新后的速度，样本无效时返回 None"""
+        units = speech_units(text)
+        if not seconds or seconds < self.MIN_SECONDS or units <= 0:
+            return None
+        rate = units / seconds
+        key = self.key(server, model, speed)
+        with self._lock:
+            planned = self._rate_locked(server, model, float(speed), "plan_units_per_sec")
+            entry = self._stats.get(key)
+            if entry:
+                entry["units_per_sec"] += self.alpha * (rate - entry["units_per_sec"])
+                entry["samples"] += 1
+            else:
+                entry = self._stats[key] = {"units_per_sec": rate, "samples": 1}
+            result = entry["units_per_sec"]
+            if abs(result - planned) > self.PLAN_DRIFT * planned:
+                planned = result
+            entry["plan_units_per_sec"] = planned
+            self._save_locked()
+        return result
+
+    def observe_wav(self, server, model, speed, text, wav_path):
+        return self.observe(server, model, speed, text, wav_duration(wav_path))
+
+    def _save_locked(self):
+        if not self.path:
+            return
+        try:
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".speech_rate_", suffix=".tmp", dir=directory)
+            with open(fd, "w", encoding="utf-8") as f:
+                json.dump(self._stats, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
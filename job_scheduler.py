@@ -0,0 +1,227 @@
+# 语音生成任务调度（不依赖 Tk）：任务按优先级排队，限制同时运行的任务总数和每个模型的任务数；
+# 运行中的任务可以取消，生成代码在轮询、等待和各块之间检查取消标志，抛出 JobCancelled 并清理临时文件。
+
+import heapq
+import itertools
+import threading
+import time
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+STATE_LABELS = {QUEUED: "排队中", RUNNING: "运行中", DONE: "已完成", FAILED: "失败", CANCELLED: "已取消"}
+
+
+class JobCancelled(BaseException):
+    """
+    任务已被取消
+    与 KeyboardInterrupt 一样继承 BaseException：不会被生成代码中的 except Exception 吞掉，也不会触发重试或换服务器
+    """
+
+
+def check_cancelled(job):
+    """job 已取消时抛出 JobCancelled；job 为 None（不经调度器直接调用）时什么也不做"""
+    if job is not None and job.cancel_event.is_set():
+        raise JobCancelled()
+
+
+def cancellable_sleep(job, seconds):
+    """等待 seconds 秒；期间任务被取消时立即抛出 JobCancelled"""
+    if job is None:
+        time.sleep(seconds)
+    elif job.cancel_event.wait(seconds):
+        raise JobCancelled()
+
+
+class Job:
+    """
+    model: 模型（标签页）名，用于每个模型的并发上限
+    fn: fn(job) 在后台线程中执行，返回值存入 result
+    title: 显示在任务列表中的说明
+    priority: 越大越先运行
+    data: 提交时记录的输入（如生成文本），排队期间界面上的修改不影响该任务
+    """
+
+    def __init__(self, job_id, model, fn, title="", priority=0, data=None):
+        self.id = job_id
+        self.model = model
+        self.fn = fn
+        self.title = title
+        self.priority = priority
+        self.data = data or {}
+        self.state = QUEUED
+        self.progress = ""
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def finished(self):
+        return self.state in (DONE, FAILED, CANCELLED)
+
+    def elapsed(self):
+        """运行时长（秒），尚未开始时返回 None"""
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class JobScheduler:
+    """
+    max_running: 同时运行的任务总数上限
+    max_per_model: 每个模型同时运行的任务数上限
+    on_change: 任务状态或进度变化时调用（可能在任意线程中，界面需自行切回主线程）
+    log: 日志函数
+    每个运行中的任务占用一个后台线程；某个模型已满时跳过它的任务，不阻塞其他模型
+    """
+
+    def __init__(self, max_running=2, max_per_model=1, on_change=None, log=None):
+        self.max_running = max(1, max_running)
+        self.max_per_model = max(1, max_per_model)
+        self.on_change = on_change
+        self.log = log or (lambda msg: None)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._queue = []        # 堆: (-priority, 提交序号, job)
+        self._jobs = []         # 按提交顺序的全部任务（供任务列表显示）
+        self._running = {}      # model -> 运行中的任务数
+        self._running_total = 0
+
+    def submit(self, model, fn, title="", priority=0, data=None):
+        """加入队列，有空闲名额时立即开始；返回 Job"""
+        with self._lock:
+            job = Job(next(self._ids), model, fn, title, priority, data)
+            self._jobs.append(job)
+            heapq.heappush(self._queue, (-priority, next(self._seq), job))
+            waiting = sum(1 for _, _, j in self._queue if j.state == QUEUED)
+            started = self._dispatch_locked()
+        if job not in started:
+            self.log(f"[JOB] 任务 #{job.id} 已加入队列（排队 {waiting} 个）")
+        self._start(started)
+        self._notify()
+        return job
+
+    def cancel(self, job_id):
+        """取消排队中或运行中的任务；运行中的任务在下一次检查取消标志时停止"""
+        with self._lock:
+            job = self._find_locked(job_id)
+            if job is None or job.finished:
+                return False
+            job.cancel_event.set()
+            queued = job.state == QUEUED
+            if queued:
+                job.state = CANCELLED
+                job.finished_at = time.time()
+            else:
+                job.progress = "正在取消..."
+        self.log(f"[JOB] 任务 #{job_id} {'已取消' if queued else '正在取消...'}")
+        self._notify()
+        return True
+
+    def cancel_all(self):
+        for job in self.jobs():
+            if not job.finished:
+                self.cancel(job.id)
+
+    def prioritize(self, job_id):
+        """把排队中的任务提到队首（优先级设为当前排队任务中的最高值 + 1）"""
+        with self._lock:
+            job = self._find_locked(job_id)
+            if job is None or job.state != QUEUED:
+                return False
+            job.priority = max(j.priority for _, _, j in self._queue if j.state == QUEUED) + 1
+            self._queue = [(-j.priority, seq, j) for _, seq, j in self._queue if j.state == QUEUED]
+            heapq.heapify(self._queue)
+        self.log(f"[JOB] 任务 #{job_id} 已提到队首")
+        self._notify()
+        return True
+
+    def set_progress(self, job, text):
+        if job is None:
+            return
+        job.progress = text
+        self._notify()
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs)
+
+    def running_count(self):
+        """仍在运行（包括已请求取消、正在清理）的任务数"""
+        with self._lock:
+            return self._running_total
+
+    def clear_finished(self):
+        with self._lock:
+            self._jobs = [j for j in self._jobs if not j.finished]
+        self._notify()
+
+    def _find_locked(self, job_id):
+        for job in self._jobs:
+            if job.id == job_id:
+                return job
+        return None
+
+    def _dispatch_locked(self):
+        """按优先级取出可以开始的任务并标记为运行中，返回这些任务"""
+        started = []
+        skipped = []
+        while self._queue and self._running_total < self.max_running:
+            entry = heapq.heappop(self._queue)
+            job = entry[2]
+            if job.state != QUEUED:
+                # 排队时已取消
+                continue
+            if self._running.get(job.model, 0) >= self.max_per_model:
+                skipped.append(entry)
+                continue
+            job.state = RUNNING
+            job.started_at = time.time()
+            self._running[job.model] = self._running.get(job.model, 0) + 1
+            self._running_total += 1
+            started.append(job)
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+        return started
+
+    def _start(self, jobs):
+        for job in jobs:
+            self.log(f"[JOB] 任务 #{job.id} 开始运行: {job.title}")
+            threading.Thread(target=self._run, args=(job,), name=f"tts-job-{job.id}", daemon=True).start()
+
+    def _run(self, job):
+        state = FAILED
+        try:
+            job.result = job.fn(job)
+            state = DONE
+        except JobCancelled:
+            state = CANCELLED
+        except Exception as e:
+            job.error = str(e)
+        finally:
+            with self._lock:
+                job.state = state
+                job.finished_at = time.time()
+                if state != FAILED:
+                    job.progress = ""
+                self._running[job.model] -= 1
+                self._running_total -= 1
+                started = self._dispatch_locked()
+            if state == DONE:
+                self.log(f"[JOB] 任务 #{job.id} 已完成（用时 {job.elapsed():.1f} 秒）")
+            elif state == CANCELLED:
+                self.log(f"[JOB] 任务 #{job.id} 已取消")
+            else:
+                self.log(f"[JOB][ERROR] 任务 #{job.id} 失败: {job.error}")
+            self._start(started)
+            self._notify()
+
+    def _notify(self):
+        if self.on_change is not None:
+            self.on_change()
@@ -0,0 +1,217 @@
+"""
+命令行文本规范化：按行或按段流式读取输入文件，转换数字后逐块写出
+
+用法：
+    python normalize_cli.py input.txt -o output.txt [--unit line|paragraph]
+    python normalize_cli.py - < input.txt > output.txt
+    python normalize_cli.py scripts/ [--jobs 8] [--pattern "*.txt"]
+    python normalize_cli.py input.txt -o output.txt --lexicon lexicon.tsv
+    python normalize_cli.py scripts/ --unit paragraph --cache cache/conversion_cache.sqlite
+
+内存占用只与单行/单段大小有关，结束时在 stderr 输出吞吐量（MB/s）。
+输入为目录时，用进程池并行转换目录树下的所有匹配文件，输出文件原子写入到
+输入文件旁边（如 a.txt -> a.normalized.txt），并按输入顺序写出汇总清单。
+指定 --cache 时，转换结果按行/段缓存到磁盘（各进程共享），重复的段落不再重新扫描。
+"""
+import argparse
+import fnmatch
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import text_normalizer
+from conversion_cache import ConversionCache
+from pronunciation_lexicon import load_lexicon
+
+# 编译好的发音词典默认缓存在程序目录下
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+
+# 每个进程只加载一次发音词典、只打开一次结果缓存（进程池 worker 复用）
+_lexicons = {}
+_caches = {}
+
+
+def get_lexicon(path, cache_dir=DEFAULT_CACHE_DIR):
+    if not path:
+        return None
+    if path not in _lexicons:
+        _lexicons[path] = load_lexicon(path, cache_dir)
+    return _lexicons[path]
+
+
+def get_cache(db_path, max_mb=64):
+    if not db_path:
+        return None
+    if db_path not in _caches:
+        _caches[db_path] = ConversionCache(db_path=db_path, max_db_bytes=int(max_mb * 1024 * 1024))
+    return _caches[db_path]
+
+
+class _ByteCounter:
+    """逐行读取二进制输入并解码为文本，同时统计读取的字节数"""
+
+    def __init__(self, stream, encoding):
+        self.stream = stream
+        self.encoding = encoding
+        self.bytes_read = 0
+
+    def __iter__(self):
+        for raw in self.stream:
+            self.bytes_read += len(raw)
+            yield raw.decode(self.encoding)
+
+
+def normalize_file(src, dst, unit="line", encoding="utf-8", lexicon=None, cache=None):
+    """将二进制输入流转换后写入文本输出流，返回读取的字节数"""
+    counter = _ByteCounter(src, encoding)
+    for piece in text_normalizer.normalize_lines(counter, unit, lexicon, cache):
+        dst.write(piece)
+    if cache is not None:
+        cache.flush()
+    return counter.bytes_read
+
+
+def output_path_for(path, suffix):
+    """输出文件放在输入文件旁边：a.txt -> a<suffix>.txt"""
+    root, ext = os.path.splitext(path)
+    return f"{root}{suffix}{ext}"
+
+
+def find_inputs(directory, pattern, suffix):
+    """按稳定顺序（目录、文件名排序）列出目录树下待转换的文件，跳过已生成的输出文件"""
+    inputs = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if not fnmatch.fnmatch(name, pattern):
+                continue
+            if os.path.splitext(name)[0].endswith(suffix):
+                continue
+            inputs.append(os.path.join(dirpath, name))
+    return inputs
+
+
+def convert_file_atomic(task):
+    """
+    进程池 worker：转换单个文件，先写同目录下的临时文件再 os.replace，
+    中途失败不会留下半个输出文件；返回清单中的一条记录
+    """
+    path, out_path, unit, encoding, lexicon_path, cache_path, cache_mb = task
+    start = time.perf_counter()
+    entry = {"input": path, "output": out_path}
+    fd, tmp_path = tempfile.mkstemp(prefix=".normalize_", suffix=".tmp", dir=os.path.dirname(out_path) or ".")
+    try:
+        lexicon = get_lexicon(lexicon_path)
+        cache = get_cache(cache_path, cache_mb)
+        with open(path, "rb") as src, open(fd, "w", encoding=encoding, newline="") as dst:
+            entry["bytes"] = normalize_file(src, dst, unit, encoding, lexicon, cache)
+        # mkstemp 创建的文件权限为 0600，改为与输入文件一致
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        os.replace(tmp_path, out_path)
+        entry["status"] = "ok"
+    except Exception as e:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        entry["status"] = "error"
+        entry["error"] = str(e)
+    entry["seconds"] = round(time.perf_counter() - start, 4)
+    return entry
+
+
+def convert_directory(directory, jobs=None, pattern="*.txt", suffix=".normalized",
+                      unit="line", encoding="utf-8", manifest_name="normalize_manifest.json",
+                      lexicon_path=None, cache_path=None, cache_mb=64):
+    """用进程池转换整个目录树，返回按输入顺序排列的清单"""
+    inputs = find_inputs(directory, pattern, suffix)
+    if lexicon_path:
+        # 先在主进程编译并写入磁盘缓存，worker 直接加载缓存
+        get_lexicon(lexicon_path)
+    if cache_path:
+        # 先在主进程建表，避免多个 worker 同时初始化
+        get_cache(cache_path, cache_mb)
+    tasks = [(path, output_path_for(path, suffix), unit, encoding, lexicon_path, cache_path, cache_mb)
+             for path in inputs]
+    # 大文件先提交，避免最后只剩一个大文件在单核上跑；结果按下标放回，清单仍保持输入顺序
+    order = sorted(range(len(tasks)), key=lambda i: os.path.getsize(tasks[i][0]), reverse=True)
+    entries = [None] * len(tasks)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {i: executor.submit(convert_file_atomic, tasks[i]) for i in order}
+        for i, future in futures.items():
+            entries[i] = future.result()
+
+    manifest = {
+        "directory": directory,
+        "pattern": pattern,
+        "unit": unit,
+        "files": entries,
+    }
+    manifest_path = os.path.join(directory, manifest_name)
+    fd, tmp_path = tempfile.mkstemp(prefix=".manifest_", suffix=".tmp", dir=directory)
+    with open(fd, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="将文本中的数字转换为英文（流式处理）")
+    parser.add_argument("input", help="输入文件或目录，'-' 表示标准输入")
+    parser.add_argument("-o", "--output", default="-", help="输出文件，默认标准输出（目录模式下忽略）")
+    parser.add_argument("--unit", choices=("line", "paragraph"), default="line",
+                        help="流式处理的单位：逐行或逐段（空行分段）")
+    parser.add_argument("--encoding", default="utf-8")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="目录模式下的进程数，默认CPU核数")
+    parser.add_argument("--pattern", default="*.txt", help="目录模式下匹配的文件名")
+    parser.add_argument("--suffix", default=".normalized", help="目录模式下输出文件名的后缀")
+    parser.add_argument("--lexicon", default=None, help="自定义发音词典（.json 或 每行 原文<TAB>读法）")
+    parser.add_argument("--cache", default=None, help="转换结果缓存文件（sqlite），重复的行/段直接取缓存")
+    parser.add_argument("--cache-mb", type=float, default=64, help="结果缓存的容量上限（MB），超出时淘汰最久未用的条目")
+    parser.add_argument("-q", "--quiet", action="store_true", help="不输出吞吐量统计")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if os.path.isdir(args.input):
+        manifest = convert_directory(args.input, args.jobs, args.pattern, args.suffix, args.unit, args.encoding,
+                                     lexicon_path=args.lexicon, cache_path=args.cache, cache_mb=args.cache_mb)
+        elapsed = time.perf_counter() - start
+        files = manifest["files"]
+        failed = [e for e in files if e["status"] != "ok"]
+        for e in failed:
+            print(f"转换失败: {e['input']}: {e['error']}", file=sys.stderr)
+        if not args.quiet:
+            mb = sum(e.get("bytes", 0) for e in files) / (1024 * 1024)
+            rate = mb / elapsed if elapsed > 0 else float("inf")
+            print(f"处理完成: {len(files)} 个文件, {mb:.2f} MB, 用时 {elapsed:.2f} 秒, 吞吐量 {rate:.2f} MB/s",
+                  file=sys.stderr)
+        return 1 if failed else 0
+
+    src = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    try:
+        if args.output == "-":
+            dst = open(sys.stdout.fileno(), "w", encoding=args.encoding, newline="", closefd=False)
+        else:
+            dst = open(args.output, "w", encoding=args.encoding, newline="")
+        with dst:
+            cache = get_cache(args.cache, args.cache_mb)
+            bytes_read = normalize_file(src, dst, args.unit, args.encoding, get_lexicon(args.lexicon), cache)
+    finally:
+        if src is not sys.stdin.buffer:
+            src.close()
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        mb = bytes_read / (1024 * 1024)
+        rate = mb / elapsed if elapsed > 0 else float("inf")
+        print(f"处理完成: {mb:.2f} MB, 用时 {elapsed:.2f} 秒, 吞吐量 {rate:.2f} MB/s", file=sys.stderr)
+        if cache is not None:
+            print(f"结果缓存: 命中 {cache.hits}, 未命中 {cache.misses}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# 批量数字转英文（NumPy 向量化）
+# 先用向量化的整除/取余把整数数组拆成三位分组（以及年份的前后两半），
+# 再从预先生成的词表中整体取词、逐元素拼接，输出与逐个调用
+# number_to_words / convert_number 的结果完全一致。
+
+from number_speller import GROUP_WORDS, YEAR_WORDS, SCALES
+
+# 尝试导入numpy，用于批量转换
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+_tables = None
+
+
+def _get_tables():
+    """生成（并缓存）object 类型的词表数组，取词与拼接都在 NumPy 的 C 循环中完成"""
+    global _tables
+    if _tables is None:
+        group = np.array(GROUP_WORDS, dtype=object)
+        # 带前导空格的分组读法，0 对应空串，拼接时无需再判断分隔符
+        spaced = np.array([""] + [" " + w for w in GROUP_WORDS[1:]], dtype=object)
+        # 各量级的带空格读法，例如 " twelve million"
+        levels = [spaced] + [
+            np.array([""] + [f" {w} {scale}" for w in GROUP_WORDS[1:]], dtype=object)
+            for scale in SCALES[1:]
+        ]
+        thousands = np.array([f"{w} thousand" for w in GROUP_WORDS], dtype=object)
+        years = np.array(YEAR_WORDS, dtype=object)
+        _tables = (group, spaced, levels, thousands, years)
+    return _tables
+
+
+def numbers_to_words(values, year_format=True):
+    """
+    批量将非负整数数组转换为英文单词，返回字符串列表
+    year_format=True 时 1000-9999 按年份读法（与 process_text 一致），
+    否则与 number_to_words 逐个转换的结果一致
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("需要安装numpy库才能批量转换数字。请运行: pip install numpy")
+
+    arr = np.asarray(values)
+    if arr.dtype.kind not in "iu":
+        raise ValueError(f"只支持整数数组，实际类型: {arr.dtype}")
+    arr = arr.ravel()
+    if arr.dtype.kind == "i":
+        if arr.size and arr.min() < 0:
+            raise ValueError("不支持负数")
+    arr = arr.astype(np.uint64)
+
+    group, spaced, levels, thousands, years = _get_tables()
+    result = np.empty(arr.shape, dtype=object)
+
+    # 0-999：直接查分组表
+    small = arr < 1000
+    result[small] = group[arr[small]]
+
+    # 1000-999999：千位分组 + 余数分组
+    mid = (arr >= 1000) & (arr < 1000000)
+    mid_values = arr[mid]
+    result[mid] = thousands[mid_values // 1000] + spaced[mid_values % 1000]
+
+    # 年份：1000-9999 直接查年份表（覆盖上面的千位读法）
+    if year_format:
+        year = (arr >= 1000) & (arr <= 9999)
+        result[year] = years[arr[year] - 1000]
+
+    # 一百万及以上：逐个量级取词后拼接，最后去掉开头的空格
+    big = arr >= 1000000
+    if big.any():
+        big_values = arr[big]
+        parts = np.full(big_values.shape, "", dtype=object)
+        level_count = len(str(int(big_values.max()))) // 3 + 1
+        for k in range(level_count - 1, -1, -1):
+            parts = parts + levels[k][(big_values // np.uint64(1000 ** k)) % np.uint64(1000)]
+        result[big] = [s[1:] for s in parts]
+
+    return result.tolist()
@@ -0,0 +1,124 @@
+# 查表式数字转英文
+# 0-999 的分组读法和 1000-9999 的年份读法在导入时一次性生成，
+# 之后每个数字只需要几次下标查找和一次拼接，不再递归、不再逐层拼 f-string。
+
+ONES = [
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine",
+    "ten", "eleven", "twelve", "thirteen", "fourteen", "fifteen",
+    "sixteen", "seventeen", "eighteen", "nineteen",
+]
+TENS = ["", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
+
+
+def _build_group_words():
+    """生成 0-999 的英文读法表（与原 number_to_words 的输出逐字一致）"""
+    table = ONES + [""] * 980
+    for n in range(20, 100):
+        tens, ones = divmod(n, 10)
+        table[n] = TENS[tens] if ones == 0 else f"{TENS[tens]}-{ONES[ones]}"
+    for n in range(100, 1000):
+        hundreds, remainder = divmod(n, 100)
+        if remainder == 0:
+            table[n] = f"{ONES[hundreds]} hundred"
+        else:
+            table[n] = f"{ONES[hundreds]} hundred {table[remainder]}"
+    return table
+
+
+GROUP_WORDS = _build_group_words()
+
+
+def _build_year_words():
+    """生成 1000-9999 的年份读法表，下标为 num - 1000（规则与 process_text 中的年份分支一致）"""
+    table = []
+    for num in range(1000, 10000):
+        year_part1, year_part2 = divmod(num, 100)
+        if num < 2000:
+            table.append(f"{GROUP_WORDS[year_part1]} {GROUP_WORDS[year_part2]}")
+        elif year_part2 == 0:
+            table.append("two thousand")
+        else:
+            table.append(f"two thousand {GROUP_WORDS[year_part2]}")
+    return table
+
+
+YEAR_WORDS = _build_year_words()
+
+
+# 三位一组的量级名称，下标即组号（0 为个位组）
+SCALES = [
+    "", "thousand", "million", "billion", "trillion", "quadrillion", "quintillion",
+    "sextillion", "septillion", "octillion", "nonillion", "decillion",
+    "undecillion", "duodecillion", "tredecillion", "quattuordecillion",
+    "quindecillion", "sexdecillion", "septendecillion", "octodecillion",
+    "novemdecillion", "vigintillion",
+]
+
+
+def number_to_words(num):
+    """将数字转换为英文单词"""
+    if num < 1000:
+        return GROUP_WORDS[num]
+    if num < 1000000:
+        thousands, remainder = divmod(num, 1000)
+        if remainder == 0:
+            return GROUP_WORDS[thousands] + " thousand"
+        return " ".join((GROUP_WORDS[thousands], "thousand", GROUP_WORDS[remainder]))
+    return digits_to_words(str(num))
+
+
+def digits_to_words(digits):
+    """
+    直接按数字串转换为英文，不把整个数字串转成大整数
+    按三位分组查表并附加量级名称，耗时与位数成线性关系；
+    超出量级表（66 位以上）的数字串逐位朗读
+    """
+    digits = digits.lstrip("0")
+    if not digits:
+        return GROUP_WORDS[0]
+    group_count = (len(digits) + 2) // 3
+    if group_count > len(SCALES):
+        return digits_to_digit_words(digits)
+
+    parts = []
+    # 最高组可能不足三位
+    end = len(digits) - (group_count - 1) * 3
+    start = 0
+    for scale_index in range(group_count - 1, -1, -1):
+        group = int(digits[start:end])
+        if group:
+            parts.append(GROUP_WORDS[group])
+            if scale_index:
+                parts.append(SCALES[scale_index])
+        start, end = end, end + 3
+    return " ".join(parts)
+
+
+def year_to_words(num):
+    """将四位数（1000-9999）按年份格式转换为英文"""
+    return YEAR_WORDS[num - 1000]
+
+
+# 基数词最后一个词 -> 序数词的不规则形式
+_IRREGULAR_ORDINALS = {
+    "one": "first", "two": "second", "three": "third", "five": "fifth",
+    "eight": "eighth", "nine": "ninth", "twelve": "twelfth",
+}
+
+
+def digits_to_ordinal(digits):
+    """将数字串转换为英文序数词，例如 "21" -> "twenty-first" """
+    words = digits_to_words(digits)
+    # 只需改写最后一个词（连字符后的部分），例如 twenty-one -> twenty-first
+    cut = max(words.rfind(" "), words.rfind("-")) + 1
+    head, last = words[:cut], words[cut:]
+    if last in _IRREGULAR_ORDINALS:
+        return head + _IRREGULAR_ORDINALS[last]
+    if last.endswith("y"):
+        return head + last[:-1] + "ieth"
+    return head + last + "th"
+
+
+def digits_to_digit_words(digits):
+    """逐位朗读数字串（用于小数部分），例如 "05" -> "zero five" """
+    return " ".join(ONES[int(d)] for d in digits)
@@ -0,0 +1,84 @@
+# 实时预览的后台转换线程（不依赖 Tk）
+# 主线程只负责投递输入快照和把结果写回控件；比对、转换都在后台线程完成。
+# 只保留最新一次投递：转换过程中有新的输入到来时，旧任务的结果直接丢弃。
+
+import threading
+
+from text_diff import changed_span
+
+
+def plan_line_update(old_lines, new_lines, hint=None):
+    """
+    比对新旧行列表，返回需要替换的行区间 (start, old_end, new_end)，没有变化时返回 None
+    区间两侧各至少保留一行，保证控件中的替换范围非空
+    """
+    start, old_end, new_end = changed_span(old_lines, new_lines, hint)
+    if start == old_end and start == new_end:
+        return None
+    if start == old_end or start == new_end:
+        if start > 0:
+            start -= 1
+        else:
+            old_end += 1
+            new_end += 1
+    return start, old_end, new_end
+
+
+class PreviewWorker:
+    """
+    convert_line: 单行转换函数（在后台线程调用）
+    post: 把回调投递回 UI 线程执行，例如 lambda cb: root.after(0, cb)
+    """
+
+    def __init__(self, convert_line, post):
+        self.convert_line = convert_line
+        self.post = post
+        self._cond = threading.Condition()
+        self._job = None
+        self._latest = 0
+        self._thread = None
+
+    def submit(self, generation, text, base_lines, hint, on_result, offset=0):
+        """
+        投递一次转换：text 为输入框快照，base_lines 为当前预览镜像中对应的输入行
+        只投递变化附近的几行时，offset 为它们在全文中的起始行号，返回的行号已加上 offset
+        完成后在 UI 线程调用 on_result(generation, start, old_end, new_lines, out_lines)；没有变化时 new_lines 为空
+        """
+        with self._cond:
+            self._job = (generation, text, base_lines, hint, on_result, offset)
+            self._latest = generation
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._job is None:
+                    self._cond.wait()
+                generation, text, base_lines, hint, on_result, offset = self._job
+                self._job = None
+            try:
+                lines = text.split("\n")
+                plan = plan_line_update(base_lines, lines, hint)
+                if plan is None:
+                    # 仍然回调，让 UI 知道镜像已与这次快照一致
+                    self.post(lambda g=generation, s=offset, cb=on_result: cb(g, s, s, [], []))
+                    continue
+                start, old_end, new_end = plan
+                new_lines = lines[start:new_end]
+                start += offset
+                old_end += offset
+                out = []
+                for line in new_lines:
+                    if self._latest != generation:
+                        break  # 已有更新的输入，放弃这次转换
+                    out.append(self.convert_line(line))
+                else:
+                    # 使用默认参数避免闭包问题（线程会继续处理下一个任务并改写这些变量）
+                    self.post(lambda g=generation, s=start, e=old_end, nl=new_lines, o=out, cb=on_result:
+                              cb(g, s, e, nl, o))
+            except Exception:
+                # 预览失败不影响编辑，下一次输入会重新比对
+                continue
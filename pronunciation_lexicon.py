@@ -0,0 +1,248 @@
+# 自定义发音词典（例如 "F5" -> "F five"、品牌名、单位缩写）
+# 所有词条编译成一个 Aho-Corasick 自动机，对文本只做一次线性扫描；
+# 编译结果按词典内容的哈希缓存到磁盘，下次启动直接加载：
+# 缓存文件为一行 JSON 头加几个整数数组的原始字节（不用 pickle，缓存文件被替换也不会执行代码），
+# 转移表按状态顺序压平成边表（每个状态的边数、边上的字符、目标状态），加载时不需要重新计算失败指针。
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from array import array
+from itertools import islice
+
+# 自动机结构或缓存格式变化时修改，使旧的磁盘缓存失效
+LEXICON_FORMAT_VERSION = 4
+
+# 缓存文件中依次存放的数组: (名称, array 类型码)
+_CACHE_ARRAYS = (("edge_count", "i"), ("edge_next", "i"), ("fail", "i"), ("out", "i"),
+                 ("dict_link", "i"), ("depth", "i"))
+
+
+def parse_entries(data: bytes, path: str = "") -> dict:
+    """
+    解析词典文件内容
+    .json：{"F5": "F five", ...}
+    其他：每行一个词条，"原文<TAB>读法" 或 "原文=读法"，# 开头为注释
+    """
+    text = data.decode("utf-8-sig")
+    if path.lower().endswith(".json"):
+        entries = json.loads(text)
+        if not isinstance(entries, dict):
+            raise ValueError("JSON 词典必须是 {原文: 读法} 格式")
+        return {str(k): str(v) for k, v in entries.items() if k}
+
+    entries = {}
+    for line_no, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        sep = "\t" if "\t" in line else "="
+        if sep not in line:
+            raise ValueError(f"词典第 {line_no} 行格式错误: {line}")
+        key, value = line.split(sep, 1)
+        key = key.strip()
+        if key:
+            entries[key] = value.strip()
+    return entries
+
+
+class Lexicon:
+    """Aho-Corasick 多模式替换：最左最长、互不重叠，且只匹配完整的词"""
+
+    def __init__(self, entries: dict):
+        self.patterns = list(entries.keys())
+        self.replacements = [entries[p] for p in self.patterns]
+        # 词典内容指纹，用于转换结果缓存的键
+        self.fingerprint = hashlib.sha256(
+            json.dumps(sorted(entries.items()), ensure_ascii=False).encode("utf-8")).hexdigest()
+        # goto[state] = {字符: 下一状态}；fail 为失败指针；out[state] 为在此状态结束的词条下标（无则 -1）；
+        # dict_link[state] 为沿失败指针能到达的下一个有输出的状态（无则 -1）
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [-1]
+        self.dict_link = [-1]
+        self.depth = [0]
+        for index, pattern in enumerate(self.patterns):
+            self._insert(pattern, index)
+        self._build_links()
+
+    def _insert(self, pattern, index):
+        goto = self.goto
+        state = 0
+        for ch in pattern:
+            nxt = goto[state].get(ch)
+            if nxt is None:
+                nxt = len(goto)
+                goto[state][ch] = nxt
+                goto.append({})
+                self.fail.append(0)
+                self.out.append(-1)
+                self.dict_link.append(-1)
+                self.depth.append(self.depth[state] + 1)
+            state = nxt
+        self.out[state] = index
+
+    def _build_links(self):
+        # 按层序（BFS）计算失败指针和输出链接
+        goto = self.goto
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in goto[f]:
+                    f = self.fail[f]
+                target = goto[f].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                fs = self.fail[nxt]
+                self.dict_link[nxt] = fs if self.out[fs] >= 0 else self.dict_link[fs]
+
+    def to_bytes(self, source=""):
+        """
+        缓存文件内容：一行 JSON 头（格式版本、source 词典哈希、词条、边上的字符和各数组长度）加各数组的原始字节
+        """
+        arrays = {"edge_count": (len(edges) for edges in self.goto),
+                  "edge_next": (nxt for edges in self.goto for nxt in edges.values()),
+                  "fail": self.fail, "out": self.out, "dict_link": self.dict_link, "depth": self.depth}
+        arrays = {name: array(code, arrays[name]) for name, code in _CACHE_ARRAYS}
+        header = {"version": LEXICON_FORMAT_VERSION, "source": source, "byteorder": sys.byteorder,
+                  "itemsize": {name: a.itemsize for name, a in arrays.items()},
+                  "lengths": {name: len(a) for name, a in arrays.items()},
+                  "edge_chars": "".join(ch for edges in self.goto for ch in edges),
+                  "patterns": self.patterns, "replacements": self.replacements, "fingerprint": self.fingerprint}
+        parts = [json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), b"\n"]
+        parts.extend(arrays[name].tobytes() for name, _ in _CACHE_ARRAYS)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, source=""):
+        """
+        从 to_bytes 的结果恢复，不重新编译；格式版本、source 不一致或结构不完整时抛出 ValueError
+        只用 min/max/sum 检查各下标的范围（C 层循环），保证 apply 不会越界
+        """
+        head_end = data.index(b"\n")
+        header = json.loads(data[:head_end].decode("utf-8"))
+        if (header.get("version") != LEXICON_FORMAT_VERSION or header.get("source") != source
+                or header.get("byteorder") != sys.byteorder):
+            raise ValueError("词典缓存已过期")
+        arrays = {}
+        offset = head_end + 1
+        for name, code in _CACHE_ARRAYS:
+            a = array(code)
+            if header["itemsize"][name] != a.itemsize:
+                raise ValueError("词典缓存格式不匹配")
+            size = header["lengths"][name] * a.itemsize
+            a.frombytes(data[offset:offset + size])
+            offset += size
+            arrays[name] = a
+        if offset != len(data):
+            raise ValueError("词典缓存长度不符")
+
+        lexicon = cls.__new__(cls)
+        lexicon.patterns = header["patterns"]
+        lexicon.replacements = header["replacements"]
+        lexicon.fingerprint = header["fingerprint"]
+        chars = header["edge_chars"]
+        counts, nexts, fail, out, dict_link, depth = (arrays[name].tolist() for name, _ in _CACHE_ARRAYS)
+        states = len(fail)
+        patterns = len(lexicon.patterns)
+        if (not states or len(lexicon.replacements) != patterns
+                or any(len(a) != states for a in (counts, out, dict_link, depth))
+                or not isinstance(chars, str) or len(chars) != len(nexts)
+                or min(counts) < 0 or sum(counts) != len(nexts)
+                or (nexts and not 0 < min(nexts) <= max(nexts) < states)
+                or not 0 <= min(fail) <= max(fail) < states
+                or not -1 <= min(out) <= max(out) < patterns
+                or not -1 <= min(dict_link) <= max(dict_link) < states
+                or min(depth) < 0):
+            raise ValueError("词典缓存结构不完整")
+        # 按边数切回每个状态的 goto 字典；大部分状态只有一条边，单独处理更快
+        char_iter, next_iter = iter(chars), iter(nexts)
+        lexicon.goto = [{next(char_iter): next(next_iter)} if count == 1
+                        else dict(zip(islice(char_iter, count), islice(next_iter, count)))
+                        for count in counts]
+        lexicon.fail = fail
+        lexicon.out = out
+        lexicon.dict_link = dict_link
+        lexicon.depth = depth
+        return lexicon
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def apply(self, text: str) -> str:
+        """一次扫描找出所有完整词匹配，再按最左最长、不重叠的原则替换"""
+        if not self.patterns:
+            return text
+        goto, fail, out, dict_link, depth = self.goto, self.fail, self.out, self.dict_link, self.depth
+        n = len(text)
+        # longest[start] = (end, 词条下标)：从 start 开始的最长有效匹配
+        longest = {}
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            s = state if out[state] >= 0 else dict_link[state]
+            while s > 0:
+                end = i + 1
+                start = end - depth[s]
+                # 只匹配完整的词：词条首尾是字母数字时，前后不能紧挨字母数字
+                if ((start == 0 or not (text[start].isalnum() and text[start - 1].isalnum()))
+                        and (end == n or not (text[end - 1].isalnum() and text[end].isalnum()))):
+                    prev = longest.get(start)
+                    if prev is None or prev[0] < end:
+                        longest[start] = (end, out[s])
+                s = dict_link[s]
+
+        if not longest:
+            return text
+        pieces = []
+        pos = 0
+        for start in sorted(longest):
+            if start < pos:
+                continue
+            end, index = longest[start]
+            pieces.append(text[pos:start])
+            pieces.append(self.replacements[index])
+            pos = end
+        pieces.append(text[pos:])
+        return "".join(pieces)
+
+
+def load_lexicon(path: str, cache_dir: str = None) -> Lexicon:
+    """
+    加载词典文件；若 cache_dir 下已有相同内容编译好的自动机（记录的格式版本和词典哈希都一致）则直接加载，
+    否则编译后原子写入缓存
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data + f"|{LEXICON_FORMAT_VERSION}|{path.lower().endswith('.json')}".encode()).hexdigest()
+
+    cache_path = None
+    if cache_dir:
+        cache_path = os.path.join(cache_dir, f"lexicon_{digest[:24]}.bin")
+        if os.path.isfile(cache_path):
+            try:
+                with open(cache_path, "rb") as f:
+                    return Lexicon.from_bytes(f.read(), digest)
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                pass
+
+    lexicon = Lexicon(parse_entries(data, path))
+
+    if cache_path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".lexicon_", suffix=".tmp", dir=cache_dir)
+            with open(fd, "wb") as f:
+                f.write(lexicon.to_bytes(digest))
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+    return lexicon
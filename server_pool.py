@@ -0,0 +1,126 @@
+# 多服务器调度（不依赖 Tk）：每个标签页可配置多个 F5-TTS 服务器（逗号分隔），
+# 每个块交给当前在途请求最少的健康服务器；请求出错或超时时换一台服务器重试，后台定期探测各服务器是否可用。
+
+import threading
+import time
+
+
+def parse_server_list(text):
+    """"http://a:7860, http://b:7860" -> ["http://a:7860", "http://b:7860"]（去掉末尾的 /，去重并保持顺序）"""
+    servers = []
+    for item in text.replace("\n", ",").split(","):
+        item = item.strip().rstrip("/")
+        if item and item not in servers:
+            servers.append(item)
+    return servers
+
+
+class ServerPool:
+    """
+    servers: 服务器地址列表（第一个为主服务器）
+    probe: probe(server) -> bool 健康探测；None 时不做后台探测
+    probe_interval: 探测间隔（秒）
+    cooldown: 请求失败后暂停向该服务器分配的时间（秒），期间探测成功会提前恢复
+    log: 日志函数
+    """
+
+    def __init__(self, servers, probe=None, probe_interval=30, cooldown=30, log=None):
+        if not servers:
+            raise ValueError("服务器列表为空")
+        self.servers = list(servers)
+        self.probe = probe
+        self.probe_interval = probe_interval
+        self.cooldown = cooldown
+        self.log = log or (lambda msg: None)
+        self._lock = threading.Lock()
+        self._state = {s: {"outstanding": 0, "healthy": True, "down_until": 0.0, "completed": 0, "failed": 0}
+                       for s in self.servers}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _available(self, server, now):
+        state = self._state[server]
+        return state["healthy"] and state["down_until"] <= now
+
+    def acquire(self, exclude=()):
+        """选出在途请求最少的可用服务器并计入在途数；都不可用时仍在其中选一个；全部被排除时返回 None"""
+        with self._lock:
+            candidates = [s for s in self.servers if s not in exclude]
+            if not candidates:
+                return None
+            now = time.monotonic()
+            available = [s for s in candidates if self._available(s, now)] or candidates
+            server = min(available, key=lambda s: self._state[s]["outstanding"])
+            self._state[server]["outstanding"] += 1
+            return server
+
+    def release(self, server, ok=True):
+        """ok 为 None 时只减少在途数（请求被取消，不计成功或失败）"""
+        with self._lock:
+            state = self._state[server]
+            state["outstanding"] -= 1
+            if ok:
+                state["completed"] += 1
+                state["down_until"] = 0.0
+            elif ok is not None:
+                state["failed"] += 1
+                state["down_until"] = time.monotonic() + self.cooldown
+
+    def run(self, fn):
+        """在选出的服务器上执行 fn(server)；出错时换另一台服务器，所有服务器都失败后抛出最后一个异常"""
+        tried = []
+        last_error = None
+        while True:
+            server = self.acquire(exclude=tried)
+            if server is None:
+                raise last_error
+            tried.append(server)
+            try:
+                result = fn(server)
+            except Exception as e:
+                self.release(server, ok=False)
+                last_error = e
+                if len(tried) < len(self.servers):
+                    self.log(f"[POOL][WARN] 服务器 {server} 请求失败，改用其他服务器: {e}")
+                continue
+            except BaseException:
+                # 任务取消等：不换服务器，也不算该服务器出错
+                self.release(server, ok=None)
+                raise
+            self.release(server, ok=True)
+            return result
+
+    def stats(self):
+        """{服务器: {"outstanding", "healthy", "completed", "failed"}}"""
+        with self._lock:
+            now = time.monotonic()
+            return {s: {"outstanding": st["outstanding"], "healthy": self._available(s, now),
+                        "completed": st["completed"], "failed": st["failed"]}
+                    for s, st in self._state.items()}
+
+    def start(self):
+        """启动后台健康探测（立即探测一次）"""
+        if self.probe is None or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._probe_loop, name="server-probe", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _probe_loop(self):
+        while not self._stop.is_set():
+            for server in self.servers:
+                try:
+                    ok = bool(self.probe(server))
+                except Exception:
+                    ok = False
+                with self._lock:
+                    state = self._state[server]
+                    changed = state["healthy"] != ok
+                    state["healthy"] = ok
+                    if ok:
+                        state["down_until"] = 0.0
+                if changed:
+                    self.log(f"[POOL] 服务器 {server} {'已恢复' if ok else '不可用'}")
+            self._stop.wait(self.probe_interval)
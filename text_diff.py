@@ -0,0 +1,55 @@
+# 文本差异定位（不依赖 Tk）：找出新旧两份内容中唯一一段连续变化的区间
+# 只比较公共前缀和公共后缀，切片比较在 C 层完成，不逐行走 Python 循环。
+
+
+def _common_prefix_len(old, new, hint=None):
+    """old/new 为序列（行列表或字符串），返回公共前缀长度；hint 为预估的变化位置"""
+    limit = min(len(old), len(new))
+    if hint is not None:
+        hint = max(0, min(hint, limit))
+        if old[:hint] == new[:hint]:
+            lo = hint
+            # 变化通常就在 hint 附近，先线性向后走几步
+            for _ in range(8):
+                if lo < limit and old[lo] == new[lo]:
+                    lo += 1
+                else:
+                    return lo
+            hi = limit
+        else:
+            lo, hi = 0, hint
+    else:
+        lo, hi = 0, limit
+    # 二分查找：old[:k] == new[:k] 对 k 单调
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[lo:mid] == new[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix_len(old, new, limit):
+    """返回公共后缀长度，且不超过 limit（避免与公共前缀重叠）"""
+    n_old, n_new = len(old), len(new)
+    lo, hi = 0, limit
+    if lo < hi and old[n_old - 1] != new[n_new - 1]:
+        return 0
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[n_old - mid:n_old - lo] == new[n_new - mid:n_new - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def changed_span(old, new, hint=None):
+    """
+    返回 (start, old_end, new_end)：old[start:old_end] 被替换成了 new[start:new_end]
+    两者相同时返回 (len, len, len)
+    """
+    prefix = _common_prefix_len(old, new, hint)
+    suffix = _common_suffix_len(old, new, min(len(old), len(new)) - prefix)
+    return prefix, len(old) - suffix, len(new) - suffix
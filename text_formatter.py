@@ -9,6 +9,22 @@ import requests
 import random
 import string
 import time
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ThreadPoolExecutor, as_completed
+
+import text_normalizer
+from preview_worker import PreviewWorker, plan_line_update
+from text_diff import changed_span
+from pronunciation_lexicon import load_lexicon
+from conversion_cache import ConversionCache
+from duration_model import SpeechRateModel, prefix_units
+from audio_player import ChunkPlayer, playback_available
+from tts_http import ServerEventError, SessionPool, event_error_data
+from async_tts_client import AIOHTTP_AVAILABLE, SyncTTSClient
+from tts_cache import AudioCache, RefUploadCache, TranscriptCache, file_fingerprint, is_stale_upload_error
+from server_pool import ServerPool, parse_server_list
+from job_scheduler import QUEUED, STATE_LABELS, JobCancelled, JobScheduler, cancellable_sleep, check_cancelled
 
 # 尝试导入pydub，用于音频拼接
 try:
@@ -18,23 +34,82 @@ except ImportError:
     PYDUB_AVAILABLE = False
 
 class TextFormatter:
+    # 长文本分块并行生成：并行数上限，以及失败块的重试次数
+    MAX_PARALLEL_CHUNKS = 8
+    CHUNK_RETRIES = 1
+    # 最多保留多少个生成失败时已成功的块（按块文本和参数区分，超出时删除最早保留的块）
+    MAX_PARTIAL_CHUNKS = 256
+    # 关闭窗口时等待任务线程取消并清理临时文件的最长时间（秒）
+    JOB_SHUTDOWN_TIMEOUT = 10
+    # 同步方式等待一个生成结果的最长时间（秒），与原来轮询 60 次 * 2 秒一致；服务器持续发送心跳时也以此为限
+    RESULT_TIMEOUT = 120
+    
     def __init__(self, root):
         self.root = root
         self.root.title("文本格式化工具")
-        self.root.geometry("1200x700")
+        self.root.geometry("1200x800")
         
         # 配置文件路径
         self.config_file = os.path.join(os.path.dirname(__file__), "config.json")
-        
-        # 数字转英文的映射
-        self.number_words = {
-            0: "zero", 1: "one", 2: "two", 3: "three", 4: "four", 5: "five",
-            6: "six", 7: "seven", 8: "eight", 9: "nine", 10: "ten",
-            11: "eleven", 12: "twelve", 13: "thirteen", 14: "fourteen", 15: "fifteen",
-            16: "sixteen", 17: "seventeen", 18: "eighteen", 19: "nineteen",
-            20: "twenty", 30: "thirty", 40: "forty", 50: "fifty",
-            60: "sixty", 70: "seventy", 80: "eighty", 90: "ninety"
-        }
+        # 缓存目录（编译好的发音词典等）
+        self.cache_dir = os.path.join(os.path.dirname(__file__), "cache")
+        
+        # 自定义发音词典（在数字转换之前应用）
+        self.lexicon = None
+        self.lexicon_path = ""
+        
+        # 段落级转换结果缓存：内存 LRU + cache 目录下的 sqlite（conversion_cache_mb 为 0 时只用内存）
+        self.conversion_cache_mb = 64
+        self.conversion_cache = None
+        
+        # TTS 分块按朗读时长规划：每块目标 chunk_target_seconds 秒，语速从已生成的音频中学习
+        self.chunk_target_seconds = 180
+        # 边生成边播放时第一块的目标时长（尽快出声）
+        self.first_chunk_seconds = 10
+        self.rate_model = SpeechRateModel(os.path.join(self.cache_dir, "speech_rate.json"))
+        
+        # F5-TTS/E2TTS 的 HTTP 请求走按服务器复用的长连接；http_pool_size 为每个服务器的最大连接数
+        self.http_pool_size = 10
+        self.http = None
+        # 安装了 aiohttp 时，长文本的各块由同一个事件循环驱动；server_concurrency 为每个服务器同时进行的块数上限
+        self.server_concurrency = 8
+        self.tts_client = None
+        # 参考音频上传结果缓存（按服务器 + 文件指纹），有效期 ref_upload_ttl_hours 小时
+        self.ref_upload_ttl_hours = 12
+        self.ref_upload_cache = None
+        # 生成音频的磁盘缓存（按文本、模型、参考音频和全部参数寻址），audio_cache_mb 为 0 时不缓存
+        self.audio_cache_mb = 1024
+        self.audio_cache = None
+        # 每个标签页的服务器调度池（服务地址可填写多个，逗号分隔），多个服务器时每 server_probe_seconds 秒探测一次
+        self.server_pools = {}
+        self._server_pools_lock = threading.Lock()
+        # 生成失败时已成功的块: 块的复用键 -> 文件路径，按块文本和参数而不是标签页保存，同一标签页的并发任务互不影响
+        self.partial_chunks = OrderedDict()
+        self._partial_chunks_lock = threading.Lock()
+        self.server_probe_seconds = 30
+        # 参考音频的转写文本缓存（按参考音频内容哈希）
+        self.transcript_cache = TranscriptCache(os.path.join(self.cache_dir, "transcripts.json"))
+        # “生成语音”把任务加入队列：同时运行的任务总数不超过 max_running_jobs，每个标签页不超过 max_jobs_per_model
+        self.max_running_jobs = 2
+        self.max_jobs_per_model = 1
+        self.scheduler = None
+        self._jobs_refresh_pending = False
+        self._closing = False
+        
+        # 实时预览的镜像：输入框的各行，以及预览框中对应的转换结果（逐行对齐）
+        self._preview_src = [""]
+        self._preview_out = [""]
+        self._preview_src_chars = 0  # 镜像对应的输入总字符数
+        # 镜像是"处理文本"去掉首尾空白后的各行，行号与输入框不一定对齐；下次更新需整篇比对
+        self._preview_stripped = False
+        
+        # 实时预览防抖：连续按键在停顿 preview_debounce_ms 毫秒后才转换一次（0 表示每次按键同步转换）
+        self.preview_debounce_ms = 150
+        self._preview_timer = None
+        # 自镜像以来按键涉及的行: (起始行, 末尾未变的行数, 输入框当前行数)，None 表示与镜像一致
+        self._preview_dirty = None
+        self._preview_generation = 0  # 每次投递加1，用于丢弃过期的后台结果
+        self._preview_worker = PreviewWorker(self._convert_line, lambda cb: self.root.after(0, cb))
         
         # 初始化模型变量字典（在setup_ui之前初始化）
         self.tts_vars = {}  # 格式: {"f5tts": {...}, "e2tts": {...}}
@@ -42,6 +117,16 @@ class TextFormatter:
         
         self.setup_ui()
         self.load_config()
+        self.open_conversion_cache()
+        self.http = SessionPool(pool_size=self.http_pool_size)
+        if AIOHTTP_AVAILABLE:
+            self.tts_client = SyncTTSClient(max_per_server=self.server_concurrency, timeout=self.RESULT_TIMEOUT)
+        self.ref_upload_cache = RefUploadCache(os.path.join(self.cache_dir, "ref_uploads.json"),
+                                               ttl=self.ref_upload_ttl_hours * 3600)
+        self.open_audio_cache()
+        self.scheduler = JobScheduler(max_running=self.max_running_jobs, max_per_model=self.max_jobs_per_model,
+                                      on_change=self._schedule_jobs_refresh, log=self.log)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # 绑定变量变化事件以自动保存配置
         self.setup_auto_save()
@@ -83,7 +168,13 @@ class TextFormatter:
         self.export_btn.pack(pady=(0, 10))
         
         self.clear_btn = ttk.Button(button_frame, text="清空", command=self.clear_text, width=12)
-        self.clear_btn.pack()
+        self.clear_btn.pack(pady=(0, 10))
+        
+        self.lexicon_btn = ttk.Button(button_frame, text="发音词典...", command=self.browse_lexicon, width=12)
+        self.lexicon_btn.pack(pady=(0, 10))
+        
+        self.clear_lexicon_btn = ttk.Button(button_frame, text="取消词典", command=self.clear_lexicon, width=12)
+        self.clear_lexicon_btn.pack()
         
         # 预览文本框
         self.preview_text = scrolledtext.ScrolledText(main_frame, height=15, wrap=tk.WORD, state=tk.DISABLED, font=("Arial", 10))
@@ -124,100 +215,348 @@ class TextFormatter:
         # 注意：变量访问将通过属性方法动态获取当前模型的变量
         # 注意：self.tts_vars 已在 __init__ 中初始化
 
+        # ========== 任务列表 ==========
+        self._build_jobs_panel(main_frame, row=4)
+
         # ========== 底部日志 ==========
         log_frame = ttk.LabelFrame(main_frame, text="日志")
-        log_frame.grid(row=4, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(6, 0))
-        main_frame.rowconfigure(4, weight=1)
+        log_frame.grid(row=5, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(6, 0))
+        main_frame.rowconfigure(5, weight=1)
         self.log_text = scrolledtext.ScrolledText(log_frame, height=8, wrap=tk.WORD, state=tk.DISABLED, font=("Consolas", 9))
         self.log_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         log_frame.columnconfigure(0, weight=1)
         log_frame.rowconfigure(0, weight=1)
-        
+
+    def _build_jobs_panel(self, main_frame, row):
+        """任务列表：排队中、运行中和已结束的生成任务，可取消、提到队首、清除已结束的任务"""
+        jobs_frame = ttk.LabelFrame(main_frame, text="任务")
+        jobs_frame.grid(row=row, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(6, 0))
+        jobs_frame.columnconfigure(0, weight=1)
+
+        columns = ("id", "model", "state", "title", "elapsed", "info")
+        tree = ttk.Treeview(jobs_frame, columns=columns, show="headings", height=4, selectmode="browse")
+        for col, heading, width, stretch in [("id", "#", 40, False), ("model", "模型", 70, False),
+                                             ("state", "状态", 70, False), ("title", "内容", 360, True),
+                                             ("elapsed", "用时", 70, False), ("info", "进度 / 信息", 360, True)]:
+            tree.heading(col, text=heading)
+            tree.column(col, width=width, stretch=stretch, anchor=tk.W)
+        tree.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        scrollbar = ttk.Scrollbar(jobs_frame, orient=tk.VERTICAL, command=tree.yview)
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        tree.configure(yscrollcommand=scrollbar.set)
+        self.jobs_tree = tree
+
+        btn_frame = ttk.Frame(jobs_frame)
+        btn_frame.grid(row=0, column=2, sticky=tk.N, padx=(8, 4))
+        ttk.Button(btn_frame, text="取消任务", command=self._cancel_selected_job, width=12).pack(pady=(0, 4))
+        ttk.Button(btn_frame, text="提到队首", command=self._prioritize_selected_job, width=12).pack(pady=(0, 4))
+        ttk.Button(btn_frame, text="清除已结束", command=self._clear_finished_jobs, width=12).pack()
+
+    def _schedule_jobs_refresh(self):
+        """调度器回调（任意线程）：合并短时间内的多次变化，在 Tk 主线程刷新一次任务列表"""
+        if self._jobs_refresh_pending:
+            return
+        self._jobs_refresh_pending = True
+        self.root.after(100, self._refresh_jobs_panel)
+
+    def _refresh_jobs_panel(self):
+        self._jobs_refresh_pending = False
+        if self.scheduler is None:
+            return
+        jobs = self.scheduler.jobs()
+        current = {str(job.id) for job in jobs}
+        for iid in self.jobs_tree.get_children():
+            if iid not in current:
+                self.jobs_tree.delete(iid)
+        for job in jobs:
+            elapsed = job.elapsed()
+            values = (job.id, job.model.upper(), STATE_LABELS[job.state], job.title,
+                      "" if elapsed is None else f"{elapsed:.1f} 秒", job.error or job.progress)
+            iid = str(job.id)
+            if self.jobs_tree.exists(iid):
+                self.jobs_tree.item(iid, values=values)
+            else:
+                self.jobs_tree.insert("", tk.END, iid=iid, values=values)
+
+    def _selected_job_id(self):
+        selection = self.jobs_tree.selection()
+        return int(selection[0]) if selection else None
+
+    def _cancel_selected_job(self):
+        job_id = self._selected_job_id()
+        if job_id is not None:
+            self.scheduler.cancel(job_id)
+
+    def _prioritize_selected_job(self):
+        job_id = self._selected_job_id()
+        if job_id is not None and not self.scheduler.prioritize(job_id):
+            self.log(f"[JOB] 任务 #{job_id} 不在排队中")
+
+    def _clear_finished_jobs(self):
+        self.scheduler.clear_finished()
+
+    def on_close(self):
+        """
+        关闭窗口：先取消所有任务，在 Tk 仍运行时等待任务线程停止并清理临时文件（最多 JOB_SHUTDOWN_TIMEOUT 秒），
+        再销毁窗口；共享的连接和缓存在 main() 中随后关闭
+        """
+        if self._closing:
+            return
+        self._closing = True
+        self.scheduler.cancel_all()
+        deadline = time.monotonic() + self.JOB_SHUTDOWN_TIMEOUT
+        def wait_for_jobs():
+            running = self.scheduler.running_count()
+            if running and time.monotonic() < deadline:
+                self.root.after(100, wait_for_jobs)
+                return
+            if running:
+                self.log(f"[JOB][WARN] 仍有 {running} 个任务未结束，直接退出")
+            self.root.destroy()
+        wait_for_jobs()
+
     def on_text_change(self, event=None):
-        # 实时预览功能
-        self.process_text()
+        # 实时预览功能：只重新转换本次编辑涉及的行
+        if not self.input_text.edit_modified():
+            return  # 光标移动等没有修改内容的按键
+        self.input_text.edit_modified(False)
+        if self.preview_debounce_ms <= 0:
+            self._update_preview_incremental()
+            return
         
-    def number_to_words(self, num):
-        """将数字转换为英文单词"""
-        if num in self.number_words:
-            return self.number_words[num]
-        
-        if num < 100:
-            tens = (num // 10) * 10
-            ones = num % 10
-            if ones == 0:
-                return self.number_words[tens]
-            else:
-                return f"{self.number_words[tens]}-{self.number_words[ones]}"
+        # 防抖：合并连续按键涉及的行区间，停顿后只把这些行交给后台线程转换
+        # 与同步路径一样按光标和行数变化推算：本次编辑的新内容为 [光标行 - 增加的行数, 光标行]，其后的行未变
+        count = int(self.input_text.index("end-1c").split(".")[0])
+        cursor = int(self.input_text.index(tk.INSERT).split(".")[0]) - 1
+        start, tail, prev_count = self._preview_dirty or (cursor, count, len(self._preview_src))
+        start = max(0, min(start, cursor - max(count - prev_count, 0)))
+        self._preview_dirty = (start, min(tail, count - cursor - 1), count)
+        if self._preview_timer:
+            self.root.after_cancel(self._preview_timer)
+        self._preview_timer = self.root.after(self.preview_debounce_ms, self._submit_preview_job)
+    
+    def _submit_preview_job(self):
+        """
+        投递按键涉及的几行（前后各多带一行）给后台线程，比对和转换都不在 Tk 主线程进行；
+        推算的区间与实际不符时（如撤销、鼠标粘贴）才读取全文
+        """
+        self._preview_timer = None
+        self._preview_generation += 1
+        if self._preview_dirty is None:
+            return
+        src = self._preview_src
+        start, tail, _ = self._preview_dirty
+        count = int(self.input_text.index("end-1c").split(".")[0])
+        tail = min(tail, len(src) - start, count - start)
+        window = self._read_preview_window(start, tail, count) if tail >= 0 else None
+        if window is None:
+            text = self.input_text.get("1.0", "end-1c")
+            self._preview_worker.submit(self._preview_generation, text, src, start, self._on_preview_result)
+            return
+        first, text = window
+        self._preview_worker.submit(self._preview_generation, text, src[first:len(src) - max(tail - 1, 0)], None,
+                                    self._on_preview_result, offset=first)
+    
+    def _read_preview_window(self, start, tail, count):
+        """
+        读取第 start - 1 行到倒数第 tail - 1 行（到两端为止），返回 (起始行, 文本)；
+        区间外紧邻的行或总字符数与镜像对不上时返回 None
+        """
+        if self._preview_stripped:
+            return None
+        src = self._preview_src
+        first = max(start - 1, 0)
+        new_last = count - max(tail - 1, 0)  # 不含
+        old_last = len(src) - max(tail - 1, 0)
+        if first > 0 and self._get_input_line(first - 1) != src[first - 1]:
+            return None
+        if new_last < count and self._get_input_line(new_last) != src[old_last]:
+            return None
+        text = self.input_text.get(f"{first + 1}.0", f"{new_last}.end")
+        # 总字符数也要对得上（Tk 的 B 树维护字符计数，count 不会扫描全文）
+        old_chars = sum(len(line) + 1 for line in src[first:old_last])
+        total = self.input_text.count("1.0", "end-1c", "chars")
+        total = (total[0] if isinstance(total, tuple) else total) or 0
+        if total != self._preview_src_chars - old_chars + len(text) + 1:
+            return None
+        return first, text
+    
+    def _on_preview_result(self, generation, start, old_end, new_lines, out):
+        """后台转换完成（在 Tk 主线程执行）；期间有更新的输入时丢弃结果"""
+        if generation != self._preview_generation:
+            return
+        self._replace_preview_lines(start, old_end, new_lines, out)
+        if self._preview_timer is None:
+            # 投递之后没有新的按键，镜像已与输入框一致；否则保留区间，下次与新的按键合并
+            self._preview_dirty = None
+    
+    def _cancel_pending_preview(self):
+        """取消尚未执行的防抖任务，并使后台正在进行的转换失效"""
+        if self._preview_timer:
+            self.root.after_cancel(self._preview_timer)
+            self._preview_timer = None
+        self._preview_dirty = None
+        self._preview_generation += 1
+    
+    def _convert_line(self, line):
+        if self.conversion_cache is None:
+            return text_normalizer.normalize_text(line, self.lexicon)
+        return self.conversion_cache.convert(line, self.lexicon)
+    
+    def open_conversion_cache(self):
+        """按 conversion_cache_mb 打开转换结果缓存，打开磁盘存储失败时退回只用内存"""
+        if self.conversion_cache is not None:
+            self.conversion_cache.close()
+        db_path = None
+        if self.conversion_cache_mb > 0:
+            db_path = os.path.join(self.cache_dir, "conversion_cache.sqlite")
+        try:
+            self.conversion_cache = ConversionCache(db_path=db_path,
+                                                    max_db_bytes=int(self.conversion_cache_mb * 1024 * 1024))
+        except Exception as e:
+            self.log(f"[CACHE][ERROR] 打开转换结果缓存失败，只使用内存缓存: {e}")
+            self.conversion_cache = ConversionCache()
+    
+    def open_audio_cache(self):
+        """按 audio_cache_mb 打开生成音频的缓存目录，失败时不使用缓存"""
+        self.audio_cache = None
+        if self.audio_cache_mb <= 0:
+            return
+        try:
+            self.audio_cache = AudioCache(os.path.join(self.cache_dir, "tts_audio"),
+                                          max_bytes=int(self.audio_cache_mb * 1024 * 1024))
+        except OSError as e:
+            self.log(f"[CACHE][ERROR] 打开音频缓存失败，不使用缓存: {e}")
+    
+    def _log_http_stats(self):
+        stats = self.http.stats()
+        self.log(f"[HTTP] 连接统计: 新建 {stats['opened']}, 复用 {stats['reused']}, 请求 {stats['requests']}")
+    
+    def _get_input_line(self, index):
+        """读取输入框第 index 行（从0开始）"""
+        return self.input_text.get(f"{index + 1}.0", f"{index + 1}.end")
+    
+    def _update_preview_incremental(self):
+        """
+        根据光标位置和行数变化推算本次编辑的行区间，只读取、转换并更新这些行，
+        开销与编辑大小成正比；推算的区间与实际不符时回退到差异比对
+        """
+        src = self._preview_src
+        new_count = int(self.input_text.index("end-1c").split(".")[0])
+        cursor = int(self.input_text.index(tk.INSERT).split(".")[0]) - 1
+        if self._preview_stripped:
+            self._resync_preview(cursor)
+            return
+        delta = new_count - len(src)
+        # 编辑区间以光标所在行结束：新内容为 [start, cursor]，旧内容为 [start, old_last]
+        start = cursor - max(delta, 0)
+        old_last = cursor - delta
+        if start < 0 or old_last >= len(src):
+            self._resync_preview(cursor)
+            return
+        # 校验区间两侧的行未变化，否则说明编辑不在光标处（如撤销、替换选中的多行）
+        if start > 0 and self._get_input_line(start - 1) != src[start - 1]:
+            self._resync_preview(cursor)
+            return
+        if cursor + 1 < new_count and self._get_input_line(cursor + 1) != src[old_last + 1]:
+            self._resync_preview(cursor)
+            return
+        new_lines = self.input_text.get(f"{start + 1}.0", f"{cursor + 1}.end").split("\n")
+        # 总字符数也要对得上（Tk 的 B 树维护字符计数，count 不会扫描全文）
+        old_chars = sum(len(line) + 1 for line in src[start:old_last + 1])
+        new_chars = sum(len(line) + 1 for line in new_lines)
+        total = self.input_text.count("1.0", "end-1c", "chars")
+        total = (total[0] if isinstance(total, tuple) else total) or 0
+        if total != self._preview_src_chars - old_chars + new_chars:
+            self._resync_preview(cursor)
+            return
+        self._apply_preview_lines(start, old_last + 1, new_lines)
+    
+    def _resync_preview(self, hint=None):
+        """读取整个输入框，与镜像比对出变化的行区间，只转换该区间"""
+        lines = self.input_text.get("1.0", "end-1c").split("\n")
+        plan = plan_line_update(self._preview_src, lines, hint)
+        if plan is None:
+            return
+        start, old_end, new_end = plan
+        self._apply_preview_lines(start, old_end, lines[start:new_end])
+    
+    def _apply_preview_lines(self, start, old_end, new_lines):
+        """转换 new_lines 并替换镜像中 [start, old_end) 的行"""
+        out = [self._convert_line(line) for line in new_lines]
+        self._replace_preview_lines(start, old_end, new_lines, out)
+    
+    def _replace_preview_lines(self, start, old_end, new_lines, out):
+        """用已转换的行替换镜像中 [start, old_end) 的行，并只更新预览框中对应的行"""
+        # 镜像为去掉首尾空白的版本时，只有整篇比对的结果会走到这里，替换后镜像与输入框逐行对齐
+        self._preview_stripped = False
+        self._preview_src_chars += (sum(len(line) + 1 for line in new_lines)
+                                    - sum(len(line) + 1 for line in self._preview_src[start:old_end]))
+        self._preview_src[start:old_end] = new_lines
+        if self._preview_out[start:old_end] == out:
+            return
+        old_segment = "\n".join(self._preview_out[start:old_end])
+        self._preview_out[start:old_end] = out
+        self._patch_preview(start, old_segment, "\n".join(out))
+    
+    def _patch_preview(self, first_line, old_segment, new_segment):
+        """
+        预览框从第 first_line 行（从0开始）起的 old_segment 已变为 new_segment，
+        只删除/插入两者之间真正不同的那一段字符，并保持滚动位置
+        """
+        start, old_end, new_end = changed_span(old_segment, new_segment)
+        if start == old_end and start == new_end:
+            return
         
-        elif num < 1000:
-            hundreds = num // 100
-            remainder = num % 100
-            if remainder == 0:
-                return f"{self.number_words[hundreds]} hundred"
-            else:
-                return f"{self.number_words[hundreds]} hundred {self.number_to_words(remainder)}"
+        def to_index(offset):
+            # 段内字符偏移 -> Tk 的 "行.列" 索引
+            line = first_line + 1 + old_segment.count("\n", 0, offset)
+            col = offset - (old_segment.rfind("\n", 0, offset) + 1)
+            return f"{line}.{col}"
         
-        elif num < 1000000:
-            thousands = num // 1000
-            remainder = num % 1000
-            if remainder == 0:
-                return f"{self.number_to_words(thousands)} thousand"
-            else:
-                return f"{self.number_to_words(thousands)} thousand {self.number_to_words(remainder)}"
+        begin, end = to_index(start), to_index(old_end)
+        view = self.preview_text.yview()[0]
+        self.preview_text.config(state=tk.NORMAL)
+        if old_end > start:
+            self.preview_text.delete(begin, end)
+        if new_end > start:
+            self.preview_text.insert(begin, new_segment[start:new_end])
+        self.preview_text.config(state=tk.DISABLED)
+        self.preview_text.yview_moveto(view)
         
-        else:
-            # 对于更大的数字，简化处理
-            return str(num)
+    def number_to_words(self, num):
+        """将数字转换为英文单词（查表实现，见 number_speller）"""
+        return text_normalizer.number_to_words(num)
     
     def is_year(self, num):
         """判断是否为年份（1900-2099）"""
-        return 1900 <= num <= 2099
+        return text_normalizer.is_year(num)
     
     def process_text(self):
-        """处理文本，将数字转换为英文"""
-        input_content = self.input_text.get("1.0", tk.END).strip()
-        if not input_content:
-            self.update_preview("")
-            return
-        
-        # 查找所有数字
-        def replace_number(match):
-            num_str = match.group(1)  # 获取数字部分
-            suffix = match.group(2)   # 获取后缀部分
-            num = int(num_str)
-            
-            # 如果是四位数，按照年份格式处理
-            if 1000 <= num <= 9999:
-                if num < 2000:
-                    year_part1 = num // 100
-                    year_part2 = num % 100
-                    result = f"{self.number_to_words(year_part1)} {self.number_to_words(year_part2)}"
-                else:
-                    year_part1 = num // 100
-                    year_part2 = num % 100
-                    if year_part2 == 0:
-                        result = f"two thousand"
-                    else:
-                        result = f"two thousand {self.number_to_words(year_part2)}"
-            else:
-                # 其他数字直接转换
-                result = self.number_to_words(num)
-            
-            return result + suffix
-        
-        # 使用正则表达式替换数字
-        # 匹配1位以上的数字，包括可能的后缀（如s, th, st, nd, rd等）
-        processed_text = re.sub(r'\b(\d+)([a-zA-Z]*)\b', replace_number, input_content)
-        
-        self.update_preview(processed_text)
+        """处理文本，将数字转换为英文（整篇重新转换）"""
+        self._cancel_pending_preview()
+        raw_content = self.input_text.get("1.0", "end-1c")
+        input_content = raw_content.strip()
+        
+        # 数字转换规则统一放在 text_normalizer 中，不依赖 Tk；逐行转换以便实时预览增量更新
+        src_lines = input_content.split("\n")
+        self.update_preview("\n".join(self._convert_line(line) for line in src_lines))
+        self._preview_src = src_lines
+        self._preview_src_chars = len(input_content)
+        self._preview_stripped = input_content != raw_content
+        self.input_text.edit_modified(False)
+        if self.conversion_cache is not None:
+            self.conversion_cache.flush()
     
     def update_preview(self, text):
-        """更新预览框"""
-        self.preview_text.config(state=tk.NORMAL)
-        self.preview_text.delete("1.0", tk.END)
-        self.preview_text.insert("1.0", text)
-        self.preview_text.config(state=tk.DISABLED)
+        """更新预览框：与当前内容比对，只改动变化的部分，不整体删除重建"""
+        new_lines = text.split("\n")
+        plan = plan_line_update(self._preview_out, new_lines)
+        if plan is not None:
+            start, old_end, new_end = plan
+            self._patch_preview(start, "\n".join(self._preview_out[start:old_end]),
+                                "\n".join(new_lines[start:new_end]))
+        self._preview_out = new_lines
     
     def export_text(self):
         """导出处理后的文本"""
@@ -244,7 +583,40 @@ class TextFormatter:
     def clear_text(self):
         """清空所有文本"""
         self.input_text.delete("1.0", tk.END)
-        self.update_preview("")
+        self.process_text()
+    
+    def browse_lexicon(self):
+        """选择自定义发音词典文件（.json 或 每行 原文<TAB>读法）"""
+        file_path = filedialog.askopenfilename(title="选择发音词典", filetypes=[("词典文件", "*.tsv;*.txt;*.json"), ("所有文件", "*.*")])
+        if file_path and self.set_lexicon(file_path):
+            self.process_text()
+            if not self._loading_config:
+                self.save_config()
+    
+    def clear_lexicon(self):
+        """取消自定义发音词典，重新转换预览并保存配置"""
+        if not self.lexicon_path:
+            return
+        self.set_lexicon("")
+        self.log("[LEXICON] 已取消发音词典")
+        self.process_text()
+        if not self._loading_config:
+            self.save_config()
+    
+    def set_lexicon(self, path):
+        """加载发音词典（编译结果缓存在 cache 目录），path 为空时取消词典"""
+        if not path:
+            self.lexicon = None
+            self.lexicon_path = ""
+            return True
+        try:
+            self.lexicon = load_lexicon(path, self.cache_dir)
+            self.lexicon_path = path
+            self.log(f"[LEXICON] 已加载发音词典: {path}, 共 {len(self.lexicon)} 个词条")
+            return True
+        except Exception as e:
+            self.log(f"[LEXICON][ERROR] 加载发音词典失败: {e}")
+            return False
 
     # ========== 日志 ==========
     def log(self, msg: str):
@@ -269,6 +641,7 @@ class TextFormatter:
         
         # 服务器地址
         ttk.Label(parent_frame, text="服务地址:").grid(row=0, column=0, sticky=tk.W, padx=(8, 6), pady=(8, 4))
+        # 可填写多个服务器，用逗号分隔；各块分配到在途请求最少的可用服务器
         server_var = tk.StringVar(value="http://127.0.0.1:7860")
         server_entry = ttk.Entry(parent_frame, textvariable=server_var)
         server_entry.grid(row=0, column=1, columnspan=2, sticky=(tk.W, tk.E), padx=(0, 8), pady=(8, 4))
@@ -441,6 +814,31 @@ class TextFormatter:
         auto_save_dir_var.trace('w', on_auto_save_dir_change)
         model_vars['auto_save_dir_var'] = auto_save_dir_var
         
+        # 边生成边播放：第一块取较小的长度，生成完的块立即按顺序在本地播放
+        progressive_var = tk.BooleanVar(value=False)
+        def on_progressive_change():
+            if not self._loading_config:
+                self.save_config()
+        ttk.Checkbutton(adv_frame, text="边生成边播放", variable=progressive_var,
+                        command=on_progressive_change).grid(row=5, column=0, sticky=tk.W, padx=(8, 4), pady=(0, 6))
+        model_vars['progressive_var'] = progressive_var
+        
+        # 并行块数：长文本的各块同时向服务器提交的数量
+        ttk.Label(adv_frame, text="并行块数:").grid(row=5, column=1, sticky=tk.W, padx=(8, 4), pady=(0, 6))
+        parallel_var = tk.IntVar(value=2)
+        tk.Spinbox(adv_frame, from_=1, to=self.MAX_PARALLEL_CHUNKS, textvariable=parallel_var, width=5).grid(
+            row=5, column=2, sticky=tk.W, padx=(0, 8), pady=(0, 6))
+        
+        parallel_save_timer = None
+        def on_parallel_change(*args):
+            if not self._loading_config:
+                nonlocal parallel_save_timer
+                if parallel_save_timer:
+                    self.root.after_cancel(parallel_save_timer)
+                parallel_save_timer = self.root.after(500, self.save_config)
+        parallel_var.trace('w', on_parallel_change)
+        model_vars['parallel_var'] = parallel_var
+        
         # 操作按钮
         def start_tts():
             self._start_tts_for_model(model_name)
@@ -529,11 +927,24 @@ class TextFormatter:
             model_vars['seed_var'].set(new_seed)
             self.log(f"[{model_name.upper()}] 已自动生成新随机种子: {new_seed}")
         
-        # 防止阻塞UI，开线程
-        model_vars['tts_btn'].config(state=tk.DISABLED)
-        model_vars['tts_status_var'].set(f"正在请求{model_name.upper()}...")
-        self.log(f"[{model_name.upper()}] start request")
-        threading.Thread(target=lambda: self._run_tts_safe_for_model(model_name), daemon=True).start()
+        # 加入任务队列（生成文本和参考音频/文本在此时记录，排队期间修改界面不影响该任务）
+        gen_text = model_vars['gen_text'].get("1.0", tk.END).strip()
+        if not gen_text:
+            model_vars['tts_status_var'].set("错误: 请先填写生成文本，或点击‘使用预览文本’")
+            return
+        data = {
+            'gen_text': gen_text,
+            'ref_audio': model_vars['ref_audio_var'].get().strip(),
+            'ref_text': model_vars['ref_text_var'].get().strip(),
+        }
+        title = " ".join(gen_text.split())
+        if len(title) > 60:
+            title = title[:60] + "..."
+        job = self.scheduler.submit(model_name, lambda job: self._run_tts_safe_for_model(model_name, job),
+                                    title=title, data=data)
+        if job.state == QUEUED:
+            model_vars['tts_status_var'].set(f"任务 #{job.id} 排队中...")
+        self.log(f"[{model_name.upper()}] start request（任务 #{job.id}）")
     
     def start_tts(self):
         """向后兼容的方法，使用当前选中的模型"""
@@ -594,15 +1005,24 @@ class TextFormatter:
         """向后兼容的方法，使用当前选中的模型"""
         return self._auto_save_audio_for_model(self.current_tts_model, audio_path)
 
-    def _run_tts_safe_for_model(self, model_name):
-        """为指定模型运行TTS生成（线程安全）"""
+    def _run_tts_safe_for_model(self, model_name, job=None):
+        """
+        为指定模型运行TTS生成（线程安全）
+        job 为调度器中的任务时，出错和取消在更新界面后继续抛出，由调度器记录任务状态
+        """
         model_vars = self.tts_vars.get(model_name)
         if not model_vars:
             self.log(f"[{model_name.upper()}][ERROR] 未找到模型变量")
             return
         
         try:
-            audio_path = self._call_tts_for_model(model_name)
+            if job is not None:
+                self.root.after(0, lambda: model_vars['tts_status_var'].set(f"正在请求{model_name.upper()}..."))
+            audio_path = self._call_tts_for_model(model_name, job)
+            self._log_http_stats()
+            self._log_server_stats(model_name)
+            if self.audio_cache is not None:
+                self.log(f"[CACHE] 音频缓存: 命中 {self.audio_cache.hits}, 未命中 {self.audio_cache.misses}")
             def _ok():
                 if audio_path:
                     model_vars['tts_audio_path'] = audio_path
@@ -614,15 +1034,19 @@ class TextFormatter:
                     self._auto_save_audio_for_model(model_name, audio_path)
                 else:
                     model_vars['tts_status_var'].set("未获取到音频结果")
-                model_vars['tts_btn'].config(state=tk.NORMAL)
             self.root.after(0, _ok)
+            return audio_path
+        except JobCancelled:
+            self.root.after(0, lambda: model_vars['tts_status_var'].set("已取消"))
+            raise
         except Exception as e:
             err_msg = str(e)
             def _err(msg=err_msg):
                 model_vars['tts_status_var'].set(f"错误: {msg}")
                 self.log(f"[{model_name.upper()}][ERROR] {msg}")
-                model_vars['tts_btn'].config(state=tk.NORMAL)
             self.root.after(0, _err)
+            if job is not None:
+                raise
     
     def _run_tts_safe(self):
         """向后兼容的方法，使用当前选中的模型"""
@@ -630,104 +1054,28 @@ class TextFormatter:
 
     def _split_text_into_chunks(self, text: str, max_chars_per_chunk: int = 3000) -> list:
         """
-        将文本智能分割成多个块
-        优先在段落边界分割，其次在句子边界分割
+        将文本智能分割成多个块（实现见 text_normalizer.split_text_into_chunks）
         """
-        if len(text) <= max_chars_per_chunk:
-            return [text]
-        
-        chunks = []
-        # 首先按段落分割（双换行）
-        paragraphs = re.split(r'\n\s*\n', text)
-        
-        current_chunk = ""
-        for para in paragraphs:
-            para = para.strip()
-            if not para:
-                continue
-            
-            # 如果当前段落本身就超过限制，需要进一步分割
-            if len(para) > max_chars_per_chunk:
-                # 先保存当前chunk（如果有内容）
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                    current_chunk = ""
-                
-                # 按句子分割大段落
-                sentences = re.split(r'([.!?]\s+)', para)
-                current_sentence = ""
-                for sent in sentences:
-                    if not sent:
-                        continue
-                    if len(current_sentence + sent) <= max_chars_per_chunk:
-                        current_sentence += sent
-                    else:
-                        # 保存当前句子块
-                        if current_sentence:
-                            chunks.append(current_sentence.strip())
-                        # 如果单个句子就超过限制，强制分割
-                        if len(sent) > max_chars_per_chunk:
-                            # 按单词分割
-                            words = sent.split()
-                            current_word = ""
-                            for word in words:
-                                if len(current_word + " " + word) <= max_chars_per_chunk:
-                                    current_word += (" " + word) if current_word else word
-                                else:
-                                    if current_word:
-                                        chunks.append(current_word.strip())
-                                    current_word = word
-                            current_sentence = current_word
-                        else:
-                            current_sentence = sent
-                if current_sentence:
-                    chunks.append(current_sentence.strip())
-                    current_sentence = ""
-            else:
-                # 检查添加这个段落后是否超过限制
-                if len(current_chunk + "\n\n" + para) <= max_chars_per_chunk:
-                    if current_chunk:
-                        current_chunk += "\n\n" + para
-                    else:
-                        current_chunk = para
-                else:
-                    # 保存当前chunk，开始新chunk
-                    if current_chunk:
-                        chunks.append(current_chunk.strip())
-                    current_chunk = para
-        
-        # 保存最后一个chunk
-        if current_chunk:
-            chunks.append(current_chunk.strip())
-        
-        return chunks if chunks else [text]
+        return text_normalizer.split_text_into_chunks(text, max_chars_per_chunk)
     
-    def _call_f5tts_single(self, model_name: str, gen_text: str, ref_text: str = None) -> str:
+    def _call_f5tts_single(self, model_name: str, gen_text: str, ref_text: str = None, server: str = None,
+                           job=None) -> tuple:
         """
         调用TTS生成单个音频块（内部方法，不读取UI）
-        返回临时文件路径
+        server 为 None 时使用该标签页的主服务器
+        返回 (临时文件路径, 实际使用的服务器, 是否为新生成)：取自音频缓存时不是新生成，不应再计入语速模型
         """
         model_vars = self.tts_vars.get(model_name)
         if not model_vars:
             raise ValueError(f"未找到模型变量: {model_name}")
         
-        server = model_vars['server_var'].get().rstrip('/')
-        ref_audio = model_vars['ref_audio_var'].get().strip()
+        server = (server or self._server_pool(model_name).servers[0]).rstrip('/')
+        ref_audio = self._job_ref_audio(model_name, job)
         if ref_text is None:
             ref_text = model_vars['ref_text_var'].get().strip()
-        
-        # 使用现有的call_f5tts逻辑，但只处理单个文本块
-        file_part = None
-        if ref_audio and ref_audio.strip().lower().startswith(("http://", "https://")):
-            file_part = {"path": ref_audio.strip(), "meta": {"_type": "gradio.FileData"}}
-        elif ref_audio and os.path.isfile(ref_audio):
-            try:
-                file_part = self._upload_ref_to_gradio(server, ref_audio)
-            except Exception as up_err:
-                self.log(f"[TTS][WARN] upload failed, fallback sample: {up_err}")
-                file_part = {"path": "https://github.com/gradio-app/gradio/raw/main/test/test_files/audio_sample.wav", "meta": {"_type": "gradio.FileData"}}
-        else:
-            file_part = {"path": "https://github.com/gradio-app/gradio/raw/main/test/test_files/audio_sample.wav", "meta": {"_type": "gradio.FileData"}}
+        if not ref_text:
+            # 前面的块完成后已缓存转写文本时，后续的块直接发送
+            ref_text = self._cached_transcript(ref_audio) or ""
         
         # 获取模型特定的变量
         remove_silences_var = model_vars['remove_silences_var']
@@ -771,7 +1119,7 @@ class TextFormatter:
         crossfade = round(crossfade_var.get(), 2)
         
         data_array = [
-            file_part,
+            None,  # 参考音频，确定后填入
             ref_text or "",
             gen_text,
             remove_silences_var.get(),
@@ -782,11 +1130,65 @@ class TextFormatter:
             aligned_speed
         ]
         
+        # 相同文本和参数的块已生成过时直接使用本地缓存，不请求服务器
+        cache_key = self._audio_cache_key(model_name, ref_audio, data_array)
+        cached_path = self._get_cached_audio(cache_key)
+        if cached_path:
+            return cached_path, server, False
+        
+        # 使用现有的call_f5tts逻辑，但只处理单个文本块
+        file_part = None
+        ref_cached = False
+        ref_fallback = False  # 上传失败改用示例音频
+        if ref_audio and ref_audio.strip().lower().startswith(("http://", "https://")):
+            file_part = {"path": ref_audio.strip(), "meta": {"_type": "gradio.FileData"}}
+        elif ref_audio and os.path.isfile(ref_audio):
+            try:
+                file_part, ref_cached = self._upload_ref_cached(server, ref_audio)
+            except Exception as up_err:
+                self.log(f"[TTS][WARN] upload failed, fallback sample: {up_err}")
+                file_part = {"path": "https://github.com/gradio-app/gradio/raw/main/test/test_files/audio_sample.wav", "meta": {"_type": "gradio.FileData"}}
+                cache_key = None  # 用示例音频生成的结果不缓存
+                ref_fallback = True
+        else:
+            file_part = {"path": "https://github.com/gradio-app/gradio/raw/main/test/test_files/audio_sample.wav", "meta": {"_type": "gradio.FileData"}}
+        data_array[0] = file_part
+        
+        try:
+            tmp_path, transcript = self._request_single_chunk(server, api_endpoint, data_array, job)
+        except ServerEventError as e:
+            if not ref_cached or not self._handle_stale_upload(server, ref_audio, file_part.get("path"), e.data):
+                raise
+            # 服务器已清理了之前上传的参考音频：重新上传后重试一次（超时、连接错误等直接交给调度池换服务器）
+            self.log(f"[TTS][UPLOAD] 已上传的参考音频已失效，重新上传后重试: {e}")
+            data_array[0], _ = self._upload_ref_cached(server, ref_audio)
+            tmp_path, transcript = self._request_single_chunk(server, api_endpoint, data_array, job)
+        if not ref_text and not ref_fallback:
+            self._store_transcript(model_name, ref_audio, transcript)
+            # 先保存转写文本再重新计算键，下次填入转写文本后直接命中
+            cache_key = cache_key and self._audio_cache_key(model_name, ref_audio, data_array)
+        self._store_audio(cache_key, tmp_path)
+        return tmp_path, server, True
+    
+    def _request_single_chunk(self, server, api_endpoint, data_array, job=None):
+        """
+        提交一个块的生成请求并下载结果，返回 (临时文件路径, 服务器返回的参考文本转写或 None)
+        job 被取消时停止等待并抛出 JobCancelled
+        """
+        check_cancelled(job)
+        if self.tts_client is not None:
+            # 异步客户端：提交、流式等待结果、下载都在后台事件循环中进行
+            try:
+                return self.tts_client.synthesize(server, data_array, api_endpoint,
+                                                  cancel=job.cancel_event if job is not None else None)
+            except CancelledError:
+                raise JobCancelled()
+        
         url_call = f"{server}{api_endpoint}"
         import json as json_module
         req_body = {"data": data_array}
         
-        resp = requests.post(url_call, json=req_body, headers={"Content-Type": "application/json"}, timeout=60)
+        resp = self.http.post(url_call, json=req_body, headers={"Content-Type": "application/json"}, timeout=60)
         resp.raise_for_status()
         
         event_id = None
@@ -804,18 +1206,22 @@ class TextFormatter:
         if not event_id:
             raise RuntimeError("未获取到事件ID(event_id)")
         
-        # 轮询获取音频
+        # 流式读取结果事件（服务器不支持流式时每 2 秒轮询一次）；任务取消时停止读取
         url_stream = f"{server}{api_endpoint}/{event_id}"
+        stop = job.cancel_event if job is not None else None
+        deadline = time.monotonic() + self.RESULT_TIMEOUT
         audio_url = None
         transcribed_ref_text = None
+        error_data = None
         
         for _ in range(60):
             if audio_url and transcribed_ref_text:
                 break
+            finished = False
             try:
-                r = requests.get(url_stream, timeout=30)
-                r.raise_for_status()
-                chunk = r.text
+                chunk, finished = self.http.read_event_stream(url_stream, timeout=30, stop=stop,
+                                                             deadline=deadline)
+                error_data = event_error_data(chunk)
                 if chunk:
                     import json as json_module
                     lines = chunk.strip().split('\n')
@@ -859,24 +1265,30 @@ class TextFormatter:
                                             transcribed_ref_text = data_array[2].strip()
                             except Exception:
                                 pass
+            except (requests.ConnectionError, requests.Timeout):
+                # 服务器不可达或无响应（连接错误已由连接池重试过），交给调用方换服务器
+                raise
             except Exception:
                 pass
-            if audio_url:
+            if audio_url or finished:
                 break
-            time.sleep(2)
+            cancellable_sleep(job, 2)
         
         if not audio_url:
+            if error_data is not None:
+                raise ServerEventError(error_data)
             raise RuntimeError("未获取到音频结果")
+        check_cancelled(job)
         
         # 下载音频
-        wav_resp = requests.get(audio_url, timeout=120)
+        wav_resp = self.http.get(audio_url, timeout=120)
         wav_resp.raise_for_status()
         fd, tmp_path = tempfile.mkstemp(prefix="f5tts_chunk_", suffix=".wav")
         os.close(fd)
         with open(tmp_path, "wb") as f:
             f.write(wav_resp.content)
         
-        return tmp_path
+        return tmp_path, transcribed_ref_text
     
     def _merge_audio_files(self, audio_files: list, output_path: str) -> str:
         """
@@ -908,18 +1320,33 @@ class TextFormatter:
         self.log(f"[TTS] 合并完成，输出文件: {output_path}, 时长: {len(combined)/1000:.2f} 秒")
         return output_path
 
-    def _call_tts_for_model(self, model_name):
-        """为指定模型调用TTS API"""
+    def _call_tts_for_model(self, model_name, job=None):
+        """
+        为指定模型调用TTS API
+        job: 调度器中的任务（使用其提交时记录的文本；被取消时抛出 JobCancelled 并删除临时文件），None 时读取界面
+        """
         model_vars = self.tts_vars.get(model_name)
         if not model_vars:
             raise ValueError(f"未找到模型变量: {model_name}")
         
-        server = model_vars['server_var'].get().rstrip('/')
-        ref_audio = model_vars['ref_audio_var'].get().strip()
-        ref_text = model_vars['ref_text_var'].get().strip()
-        gen_text = model_vars['gen_text'].get("1.0", tk.END).strip()
+        # 可配置多个服务器（逗号分隔），分块规划和语速模型按第一个（主）服务器
+        server = self._server_pool(model_name).servers[0]
+        if job is not None and job.data:
+            ref_audio, ref_text, gen_text = job.data['ref_audio'], job.data['ref_text'], job.data['gen_text']
+        else:
+            ref_audio = model_vars['ref_audio_var'].get().strip()
+            ref_text = model_vars['ref_text_var'].get().strip()
+            gen_text = model_vars['gen_text'].get("1.0", tk.END).strip()
         if not gen_text:
             raise ValueError("请先填写生成文本，或点击‘使用预览文本’")
+        started_at = time.perf_counter()
+        
+        # ref_text 为空时优先使用该参考音频此前的转写结果（所有块都发送它，服务器不必再转写）
+        if not ref_text:
+            cached_transcript = self._cached_transcript(ref_audio)
+            if cached_transcript:
+                ref_text = cached_transcript
+                self.log(f"[{model_name.upper()}][CACHE] 参考文本为空，使用缓存的转写文本: {ref_text[:100]}")
         
         # 重要提示：ref_text为空时，TTS会用Whisper自动转写参考音频
         # 转写结果只用于学习参考音频特征，不应出现在生成的音频中
@@ -929,39 +1356,55 @@ class TextFormatter:
             self.log(f"[{model_name.upper()}][INFO] 提示：如果生成的音频中出现了参考音频的内容，建议手动填写ref_text以避免自动转写的影响")
         
         # 检查文本长度，如果过长则自动分割
-        # 估算：约150-200字符/分钟，20分钟约3000-4000字符
-        # 为了安全，设置每个块最大3000字符（约15-20分钟）
+        # 按预计朗读时长分块：每块约 chunk_target_seconds 秒，语速按 服务器/模型/语速 从已生成的音频中学习；
+        # 标点停顿、未转换的数字按更多朗读单位计。每块仍不超过 3000 字符（朗读单位不少于字符数）
         MAX_CHARS_PER_CHUNK = 3000
+        speed = self._get_aligned_speed(model_vars)
+        units = prefix_units(gen_text)
+        max_units = min(MAX_CHARS_PER_CHUNK,
+                        self.rate_model.max_units(self.chunk_target_seconds, server, model_name, speed))
+        
+        # 边生成边播放：第一块按 first_chunk_seconds 规划，生成完的块交给播放线程按顺序播放
+        first_units = None
+        if model_vars['progressive_var'].get():
+            if not playback_available():
+                self.log(f"[{model_name.upper()}][WARN] 没有可用的本地播放方式，已关闭边生成边播放（请运行: pip install simpleaudio）")
+            elif not PYDUB_AVAILABLE:
+                self.log(f"[{model_name.upper()}][WARN] 边生成边播放需要 pydub 合并音频，已关闭（请运行: pip install pydub）")
+            else:
+                first_units = min(max_units, self.rate_model.max_units(self.first_chunk_seconds, server, model_name, speed))
         
-        if len(gen_text) > MAX_CHARS_PER_CHUNK:
-            self.log(f"[{model_name.upper()}] 检测到长文本（{len(gen_text)}字符），将自动分割成多个块")
+        if units[-1] > max_units or (first_units is not None and units[-1] > first_units):
+            estimated = units[-1] / self.rate_model.units_per_sec(server, model_name, speed)
+            self.log(f"[{model_name.upper()}] 检测到长文本（{len(gen_text)}字符，预计 {estimated:.0f} 秒），"
+                     f"将按每块约 {self.chunk_target_seconds} 秒自动分割")
             
             # 检查pydub是否可用
             if not PYDUB_AVAILABLE:
                 raise RuntimeError("检测到长文本，需要安装pydub库才能合并音频文件。\n请运行: pip install pydub")
             
-            chunks = self._split_text_into_chunks(gen_text, MAX_CHARS_PER_CHUNK)
-            self.log(f"[{model_name.upper()}] 文本已分割成 {len(chunks)} 个块")
+            # 只规划块的 (start, end) 偏移，块文本在发送时才切片
+            spans = list(text_normalizer.iter_chunk_spans(gen_text, max_units, cost=units, first_chunk_max=first_units))
+            self.log(f"[{model_name.upper()}] 文本已分割成 {len(spans)} 个块")
             
-            if len(chunks) > 1:
+            if len(spans) > 1:
                 # 批量生成音频
                 audio_files = []
                 chunk_temp_files = []  # 记录临时文件，最后清理
+                player = None
+                if first_units is not None:
+                    def on_first_audio(seconds):
+                        self.log(f"[{model_name.upper()}][METRIC] 首段音频用时: {seconds:.2f} 秒（边生成边播放）")
+                        def update_first_status(s=seconds):
+                            model_vars['tts_status_var'].set(f"正在播放第1块（首段音频用时 {s:.1f} 秒），继续生成中...")
+                        self.root.after(0, update_first_status)
+                    player = ChunkPlayer(started_at, on_first_audio, self.log)
                 
                 try:
-                    for i, chunk in enumerate(chunks):
-                        chunk_num = i + 1
-                        self.log(f"[{model_name.upper()}] 开始生成第 {chunk_num}/{len(chunks)} 块（{len(chunk)}字符）...")
-                        # 使用默认参数避免闭包问题
-                        def update_status(n=chunk_num, total=len(chunks)):
-                            model_vars['tts_status_var'].set(f"正在生成第 {n}/{total} 块...")
-                        self.root.after(0, update_status)
-                        
-                        # 为每个块生成音频（使用相同的参考文本和参考音频）
-                        chunk_audio_path = self._call_f5tts_single(model_name, chunk, ref_text)
-                        audio_files.append(chunk_audio_path)
-                        chunk_temp_files.append(chunk_audio_path)
-                        self.log(f"[{model_name.upper()}] 第 {chunk_num}/{len(chunks)} 块生成完成: {chunk_audio_path}")
+                    # 各块在有界线程池中并行生成，结果按块序号排列
+                    audio_files = self._generate_chunks_parallel(model_name, gen_text, spans, ref_text, speed,
+                                                                 player, job)
+                    chunk_temp_files = list(audio_files)
                     
                     # 合并所有音频块
                     self.log(f"[{model_name.upper()}] 开始合并 {len(audio_files)} 个音频块...")
@@ -976,19 +1419,27 @@ class TextFormatter:
                     # 合并音频
                     self._merge_audio_files(audio_files, final_path)
                     
-                    # 清理临时文件
-                    for temp_file in chunk_temp_files:
-                        try:
-                            if os.path.exists(temp_file):
-                                os.remove(temp_file)
-                        except Exception as e:
-                            self.log(f"[TTS][WARN] 清理临时文件失败: {temp_file}, 错误: {e}")
+                    # 清理临时文件（边生成边播放时由播放线程在播放完后清理）
+                    if player is not None:
+                        player.close(chunk_temp_files)
+                    else:
+                        for temp_file in chunk_temp_files:
+                            try:
+                                if os.path.exists(temp_file):
+                                    os.remove(temp_file)
+                            except Exception as e:
+                                self.log(f"[TTS][WARN] 清理临时文件失败: {temp_file}, 错误: {e}")
                     
                     self.log(f"[{model_name.upper()}] 所有音频块合并完成: {final_path}")
+                    if player is None or player.time_to_first_audio is None:
+                        self._log_full_audio_metric(model_name, started_at)
                     return final_path
                     
                 except Exception as e:
-                    # 清理已生成的临时文件
+                    # 清理已合并失败的临时文件（生成失败时已成功的块由 _generate_chunks_parallel 保留）
+                    if player is not None:
+                        player.close(chunk_temp_files, stop=True)
+                        chunk_temp_files = []
                     for temp_file in chunk_temp_files:
                         try:
                             if os.path.exists(temp_file):
@@ -1001,6 +1452,26 @@ class TextFormatter:
                 self.log(f"[TTS] 文本只有一个块，继续使用单块生成逻辑")
         
         # 以下是原来的单块生成逻辑（当文本长度不超过MAX_CHARS_PER_CHUNK时，或者只有一个块时）
+        # 选在途请求最少的健康服务器；配置了多个服务器时，出错或超时会换其他服务器
+        pool = self._server_pool(model_name)
+        def attempt(server):
+            path = self._call_single_request(model_name, server, ref_audio, ref_text, gen_text, job)
+            if path is None and len(pool.servers) > 1:
+                raise RuntimeError(f"{server} 未返回音频结果")
+            return path
+        audio_path = pool.run(attempt)
+        if audio_path:
+            self._log_full_audio_metric(model_name, started_at)
+        return audio_path
+    
+    def _log_full_audio_metric(self, model_name, started_at):
+        """没有边生成边播放时，首段音频就是完整音频"""
+        self.log(f"[{model_name.upper()}][METRIC] 首段音频用时: {time.perf_counter() - started_at:.2f} 秒（完整音频）")
+    
+    def _call_single_request(self, model_name, server, ref_audio, ref_text, gen_text, job=None):
+        """在指定服务器上生成整段文本（单个请求），返回临时文件路径，未获取到音频时返回 None"""
+        model_vars = self.tts_vars[model_name]
+        check_cancelled(job)
         
         # 检查生成文本是否包含可疑内容
         if "destruction" in gen_text.lower() or "distruction" in gen_text.lower():
@@ -1010,27 +1481,6 @@ class TextFormatter:
         if ref_text and ("destruction" in ref_text.lower() or "distruction" in ref_text.lower()):
             self.log(f"[TTS][INFO] 参考文本包含 'destruction'，这是正常的（参考文本只用于学习特征）")
 
-        # 构造与示例一致的payload
-        # 参考F5-TTS Gradio API：/gradio_api/call/basic_tts
-        file_part = None
-        if ref_audio and ref_audio.strip().lower().startswith(("http://", "https://")):
-            # 直接使用云端音频链接
-            file_part = {"path": ref_audio.strip(), "meta": {"_type": "gradio.FileData"}}
-            self.log(f"[TTS] using remote ref audio: {ref_audio.strip()}")
-        elif ref_audio and os.path.isfile(ref_audio):
-            # 本地文件，先上传到 Gradio
-            try:
-                self.root.after(0, lambda: self.tts_status_var.set("正在上传参考音频..."))
-                self.log(f"[TTS] uploading local ref audio: {ref_audio}")
-                file_part = self._upload_ref_to_gradio(server, ref_audio)
-            except Exception as up_err:
-                # 如果上传失败，退回到示例音频
-                self.log(f"[TTS][WARN] upload failed, fallback sample: {up_err}")
-                file_part = {"path": "https://github.com/gradio-app/gradio/raw/main/test/test_files/audio_sample.wav", "meta": {"_type": "gradio.FileData"}}
-        else:
-            # 无输入或非URL，使用示例音频
-            file_part = {"path": "https://github.com/gradio-app/gradio/raw/main/test/test_files/audio_sample.wav", "meta": {"_type": "gradio.FileData"}}
-
         # 获取模型特定的变量
         remove_silences_var = model_vars['remove_silences_var']
         randomize_seed_var = model_vars['randomize_seed_var']
@@ -1114,7 +1564,7 @@ class TextFormatter:
             self.log(f"[TTS][WARN] ref_text包含'destruction'但gen_text不包含，请确认参数顺序正确")
         
         data_array = [
-            file_part,
+            None,                       # 参考音频，确定后填入
             ref_text or "",
             gen_text,
             remove_silences_var.get(),  # remove_silences (bool)
@@ -1124,6 +1574,40 @@ class TextFormatter:
             nfe_steps,                   # nfe_steps (int)
             aligned_speed                # speed (float)
         ]
+        
+        # 文本和全部参数都未变化时直接使用本地缓存的音频，不请求服务器
+        cache_key = self._audio_cache_key(model_name, ref_audio, data_array)
+        cache_fields = list(data_array)  # 下面解析结果时 data_array 会被改写，保存后重新计算键时用
+        cached_path = self._get_cached_audio(cache_key)
+        if cached_path:
+            self.log(f"[{model_name.upper()}][CACHE] 文本和参数未变化，使用缓存的音频")
+            return cached_path
+        
+        # 构造与示例一致的payload
+        # 参考F5-TTS Gradio API：/gradio_api/call/basic_tts
+        file_part = None
+        ref_cached = False
+        ref_fallback = False  # 上传失败改用示例音频
+        if ref_audio and ref_audio.strip().lower().startswith(("http://", "https://")):
+            # 直接使用云端音频链接
+            file_part = {"path": ref_audio.strip(), "meta": {"_type": "gradio.FileData"}}
+            self.log(f"[TTS] using remote ref audio: {ref_audio.strip()}")
+        elif ref_audio and os.path.isfile(ref_audio):
+            # 本地文件，先上传到 Gradio
+            try:
+                self.root.after(0, lambda: self.tts_status_var.set("正在上传参考音频..."))
+                self.log(f"[TTS] uploading local ref audio: {ref_audio}")
+                file_part, ref_cached = self._upload_ref_cached(server, ref_audio)
+            except Exception as up_err:
+                # 如果上传失败，退回到示例音频
+                self.log(f"[TTS][WARN] upload failed, fallback sample: {up_err}")
+                file_part = {"path": "https://github.com/gradio-app/gradio/raw/main/test/test_files/audio_sample.wav", "meta": {"_type": "gradio.FileData"}}
+                cache_key = None  # 用示例音频生成的结果不缓存
+                ref_fallback = True
+        else:
+            # 无输入或非URL，使用示例音频
+            file_part = {"path": "https://github.com/gradio-app/gradio/raw/main/test/test_files/audio_sample.wav", "meta": {"_type": "gradio.FileData"}}
+        data_array[0] = file_part
 
         # 安全兜底：如果用户直接输入了本地路径（非上传后的路径），则拦截
         # 上传后的路径已经是 /file= 格式，应该可以直接使用
@@ -1136,6 +1620,8 @@ class TextFormatter:
                     # 用户直接输入的本地路径，强制改为示例音频
                     self.log(f"[TTS][WARN] user provided local path directly, using sample instead: {p}")
                     data_array[0] = {"path": "https://github.com/gradio-app/gradio/raw/main/test/test_files/audio_sample.wav", "meta": {"_type": "gradio.FileData"}}
+                    cache_key = None
+                    ref_fallback = True
         except Exception:
             pass
 
@@ -1169,7 +1655,7 @@ class TextFormatter:
         if aligned_speed != 1.0:
             self.log(f"[{model_name.upper()}][DEBUG] 速度值详情: 原始={speed_var.get()}, 对齐后={aligned_speed}, 类型={type(aligned_speed)}, JSON序列化后={json_module.dumps(aligned_speed)}")
             self.log(f"[{model_name.upper()}][DEBUG] data_array[8] (speed) = {data_array[8]}, 类型={type(data_array[8])}")
-        resp = requests.post(url_call, json=req_body, headers={"Content-Type": "application/json"}, timeout=60)
+        resp = self.http.post(url_call, json=req_body, headers={"Content-Type": "application/json"}, timeout=60)
         resp.raise_for_status()
         event_id = None
         # 优先解析 JSON
@@ -1196,7 +1682,10 @@ class TextFormatter:
             model_vars['tts_status_var'].set("已获取事件ID，正在生成音频...")
         self.root.after(0, update_status3)
         self.log(f"[{model_name.upper()}] stream url: {url_stream}")
-        # 轮询查询，直到生成完成拿到 wav（最多等待 ~120 秒）
+        # 流式读取事件流，收到 complete/error 事件立即返回；服务器不支持流式时每 2 秒轮询一次（最多约 120 秒）
+        # 任务取消时停止读取
+        stop = job.cancel_event if job is not None else None
+        deadline = time.monotonic() + self.RESULT_TIMEOUT
         audio_url = None
         content = ""
         transcribed_ref_text = None  # 用于存储Whisper转写的参考文本
@@ -1206,13 +1695,14 @@ class TextFormatter:
             if audio_url and transcribed_ref_text:
                 self.log(f"[TTS] 已获取到音频URL和转写文本，退出轮询")
                 break
+            finished = False
             try:
-                r = requests.get(url_stream, timeout=30)
-                r.raise_for_status()
+                chunk, finished = self.http.read_event_stream(url_stream, timeout=30, stop=stop,
+                                                             deadline=deadline)
                 # 优先尝试 JSON（许多部署直接返回 JSON 状态）
                 parsed_json = None
                 try:
-                    parsed_json = r.json()
+                    parsed_json = json_module.loads(chunk)
                 except Exception:
                     parsed_json = None
                 if parsed_json is not None:
@@ -1232,7 +1722,6 @@ class TextFormatter:
                                     audio_url = f"{server}{audio_url}"
                                 break
                 # 若不是 JSON，则当作文本内容追加并做正则匹配
-                chunk = r.text
                 if chunk:
                     content += ("\n" + chunk)
                     self.log(f"[TTS] poll text chunk: {chunk[:200]}")
@@ -1387,14 +1876,21 @@ class TextFormatter:
                         if mfile:
                             audio_url = f"{server}{mfile.group(1)}"
                     # 注意：即使找到了音频URL，也不要break，继续解析寻找process_completed消息
+            except (requests.ConnectionError, requests.Timeout):
+                # 服务器不可达或无响应（连接错误已由连接池重试过），交给调用方换服务器
+                raise
             except Exception:
                 pass
-            time.sleep(2)
+            if finished:
+                # 事件流已结束，结果已完整读取，不必再请求
+                self.log(f"[{model_name.upper()}] 事件流已结束")
+                break
+            cancellable_sleep(job, 2)
         # 如果事件流直接返回错误且使用的是远程URL，自动回退为：本机下载 -> 上传到gradio -> 重试一次
         if not audio_url and ("event: error" in content) and (ref_audio and ref_audio.lower().startswith(("http://", "https://"))):
             try:
                 self.log("[TTS][FALLBACK] remote URL failed on server side, try local-download + gradio-upload then retry once")
-                bin_resp = requests.get(ref_audio, timeout=60)
+                bin_resp = self.http.get(ref_audio, timeout=60)
                 bin_resp.raise_for_status()
                 ext = os.path.splitext(ref_audio.split('?')[0])[1] or '.mp3'
                 fd2, tmp2 = tempfile.mkstemp(prefix="tts_ref_", suffix=ext)
@@ -1444,7 +1940,7 @@ class TextFormatter:
                     get_aligned_speed_retry()  # speed (范围0.1-2.0，最小单位0.1)
                 ]
                 self.log(f"[TTS] POST {url_call} (retry with uploaded)")
-                resp2 = requests.post(url_call, json={"data": data_array2}, headers={"Content-Type": "application/json"}, timeout=60)
+                resp2 = self.http.post(url_call, json={"data": data_array2}, headers={"Content-Type": "application/json"}, timeout=60)
                 resp2.raise_for_status()
                 try:
                     j2 = resp2.json()
@@ -1460,12 +1956,14 @@ class TextFormatter:
                 url_stream2 = f"{server}/gradio_api/call/basic_tts/{event_id2}"
                 self.log(f"[TTS] stream url (retry): {url_stream2}")
                 content2 = ""
+                deadline2 = time.monotonic() + self.RESULT_TIMEOUT
                 for _ in range(60):
+                    finished2 = False
                     try:
-                        r2 = requests.get(url_stream2, timeout=30)
-                        r2.raise_for_status()
+                        chunk2, finished2 = self.http.read_event_stream(url_stream2, timeout=30, stop=stop,
+                                                                        deadline=deadline2)
                         try:
-                            pj2 = r2.json()
+                            pj2 = json_module.loads(chunk2)
                         except Exception:
                             pj2 = None
                         if pj2 is not None and isinstance(pj2, dict):
@@ -1481,7 +1979,6 @@ class TextFormatter:
                                     if audio_url.startswith("/file="):
                                         audio_url = f"{server}{audio_url}"
                                     break
-                        chunk2 = r2.text
                         if chunk2:
                             content2 += ("\n" + chunk2)
                             self.log(f"[TTS] poll text chunk (retry): {chunk2[:200]}")
@@ -1493,11 +1990,20 @@ class TextFormatter:
                         if mfile2:
                             audio_url = f"{server}{mfile2.group(1)}"
                             break
+                    except (requests.ConnectionError, requests.Timeout):
+                        raise
                     except Exception:
                         pass
-                    time.sleep(2)
+                    if finished2:
+                        break
+                    cancellable_sleep(job, 2)
             except Exception as fb_e:
                 self.log(f"[TTS][FALLBACK][ERROR] {fb_e}")
+        error_data = event_error_data(content)
+        if not audio_url and ref_cached and error_data is not None and self._handle_stale_upload(server, ref_audio, file_part.get("path"), error_data):
+            # 服务器已清理了之前上传的参考音频：重新生成（会重新上传）
+            self.log(f"[{model_name.upper()}][UPLOAD] 已上传的参考音频已失效，重新上传后重试")
+            return self._call_single_request(model_name, server, ref_audio, ref_text, gen_text, job)
         if not audio_url:
             return None
 
@@ -1532,6 +2038,8 @@ class TextFormatter:
         if transcribed_ref_text and transcribed_ref_text.strip():
             transcribed_text = transcribed_ref_text.strip()
             self.log(f"[{model_name.upper()}] 准备更新参考文本为转写结果: {transcribed_text[:100]}")
+            if not ref_text and not ref_fallback:
+                self._store_transcript(model_name, ref_audio, transcribed_text)
             def update_ref_text():
                 # 更新对应模型的参考文本字段
                 model_vars['ref_text_var'].set(transcribed_text)
@@ -1543,19 +2051,307 @@ class TextFormatter:
             self.log(f"[{model_name.upper()}][WARN] 未获取到转写文本，transcribed_ref_text={transcribed_ref_text}")
 
         # 下载到临时文件
+        check_cancelled(job)
         def update_download_status():
             model_vars['tts_status_var'].set("正在下载音频...")
         self.root.after(0, update_download_status)
         self.log(f"[{model_name.upper()}] download: {audio_url}")
-        wav_resp = requests.get(audio_url, timeout=120)
+        wav_resp = self.http.get(audio_url, timeout=120)
         wav_resp.raise_for_status()
         fd, tmp_path = tempfile.mkstemp(prefix="f5tts_", suffix=".wav")
         os.close(fd)
         with open(tmp_path, "wb") as f:
             f.write(wav_resp.content)
         self.log(f"[{model_name.upper()}] saved: {tmp_path} size={len(wav_resp.content)} bytes")
+        if cache_key and not ref_text:
+            # 转写文本已在上面保存，按它重新计算键（见 _audio_cache_key）
+            cache_key = self._audio_cache_key(model_name, ref_audio, cache_fields)
+        self._store_audio(cache_key, tmp_path)
+        self._observe_speech_rate(server, model_name, aligned_speed, gen_text, tmp_path)
         return tmp_path
+    
+    def _chunk_resume_key(self, model_name, chunk, ref_text, ref_audio):
+        """
+        块文本和生成参数相同的块再次生成时可复用上次已成功的结果（与分块方式、服务器无关）
+        """
+        model_vars = self.tts_vars[model_name]
+        randomize = model_vars['randomize_seed_var'].get()
+        params = [
+            model_name, chunk, ref_text,
+            ref_audio, model_vars['remove_silences_var'].get(), randomize,
+            None if randomize else model_vars['seed_var'].get(), round(model_vars['crossfade_var'].get(), 2),
+            int(model_vars['nfe_steps_var'].get()), self._get_aligned_speed(model_vars),
+        ]
+        return hashlib.sha256(json.dumps(params, ensure_ascii=False).encode("utf-8")).hexdigest()
+    
+    def _generate_chunks_parallel(self, model_name, gen_text, spans, ref_text, speed, player=None, job=None):
+        """
+        用有界线程池（宽度为该标签页的“并行块数”）并行生成各块，结果按块序号放回，合并后仍保持文本顺序
+        失败的块会重试；仍失败时保留已成功的块，再次用相同参数生成时直接复用
+        任务被取消时不再开始新的块，删除已生成的块并抛出 JobCancelled
+        返回按文本顺序排列的音频文件列表
+        """
+        model_vars = self.tts_vars[model_name]
+        tag = model_name.upper()
+        total = len(spans)
+        width = min(self._get_parallel_chunks(model_vars), total)
+        
+        results = [None] * total
+        ref_audio = self._job_ref_audio(model_name, job)
+        
+        def resume_keys():
+            # ref_text 为空时按缓存的转写文本计算：失败后重试时已自动填入转写文本
+            resolved = ref_text or self._cached_transcript(ref_audio) or ""
+            return [self._chunk_resume_key(model_name, gen_text[start:end], resolved, ref_audio) for start, end in spans]
+        
+        # 取出后其他任务不会再复用或删除这些块
+        if self.partial_chunks:
+            keys = resume_keys()
+            with self._partial_chunks_lock:
+                for i, key in enumerate(keys):
+                    path = self.partial_chunks.pop(key, None)
+                    if path and os.path.isfile(path):
+                        results[i] = path
+        reused = sum(1 for p in results if p)
+        if reused:
+            if player is not None:
+                for i, path in enumerate(results):
+                    if path:
+                        player.add(i, path)
+            self.log(f"[{tag}] 复用上次已生成的 {reused} 块")
+        
+        lock = threading.Lock()
+        progress = {"done": sum(1 for p in results if p), "running": 0, "failed": 0}
+        
+        def report():
+            text = f"块进度: {progress['done']}/{total} 完成，{progress['running']} 生成中"
+            if progress['failed']:
+                text += f"，{progress['failed']} 失败"
+            # 使用默认参数避免闭包问题
+            self.root.after(0, lambda t=text: model_vars['tts_status_var'].set(t))
+            if job is not None:
+                self.scheduler.set_progress(job, text)
+        
+        def run_chunk(i):
+            check_cancelled(job)
+            start, end = spans[i]
+            chunk = gen_text[start:end]
+            with lock:
+                progress["running"] += 1
+                report()
+            self.log(f"[{tag}] 开始生成第 {i + 1}/{total} 块（{len(chunk)}字符）...")
+            try:
+                # 交给在途请求最少的健康服务器，出错或超时换其他服务器
+                path, used_server, fresh = self._server_pool(model_name).run(
+                    lambda s: self._call_f5tts_single(model_name, chunk, ref_text, s, job))
+            finally:
+                with lock:
+                    progress["running"] -= 1
+            # 只用新生成的音频更新语速模型，并记在实际生成它的服务器上（缓存命中的音频已计入过）
+            if fresh:
+                self._observe_speech_rate(used_server, model_name, speed, chunk, path)
+            return path
+        
+        self.log(f"[{tag}] 并行生成 {total} 块，并行数 {width}")
+        pending = [i for i in range(total) if results[i] is None]
+        errors = {}
+        cancelled = False
+        for attempt in range(1 + self.CHUNK_RETRIES):
+            if not pending or cancelled:
+                break
+            if attempt:
+                self.log(f"[{tag}] 重试失败的块（第 {attempt} 次）: {', '.join(str(i + 1) for i in pending)}")
+                progress["failed"] = 0
+            with ThreadPoolExecutor(max_workers=width) as executor:
+                futures = {executor.submit(run_chunk, i): i for i in pending}
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        results[i] = future.result()
+                    except JobCancelled:
+                        # 其余的块在开始前或下一次检查时也会停止
+                        cancelled = True
+                        continue
+                    except Exception as e:
+                        errors[i] = e
+                        with lock:
+                            progress["failed"] += 1
+                            report()
+                        self.log(f"[{tag}][ERROR] 第 {i + 1}/{total} 块生成失败: {e}")
+                        continue
+                    with lock:
+                        progress["done"] += 1
+                        report()
+                    if player is not None:
+                        player.add(i, results[i])
+                    self.log(f"[{tag}] 第 {i + 1}/{total} 块生成完成: {results[i]}")
+            pending = [i for i in pending if results[i] is None]
+        
+        if cancelled or (job is not None and job.cancel_event.is_set()):
+            # 取消：删除已生成的块（边生成边播放时由播放线程停止播放后删除），不保留给下次复用
+            paths = [path for path in results if path]
+            if player is not None:
+                player.close(paths, stop=True)
+            else:
+                for path in paths:
+                    try:
+                        if os.path.exists(path):
+                            os.remove(path)
+                    except OSError:
+                        pass
+            raise JobCancelled()
+        
+        if pending:
+            kept = {key: path for key, path in zip(resume_keys(), results) if path}
+            self._keep_partial_chunks(kept, [path for path in results if path])
+            raise RuntimeError(f"第 {', '.join(str(i + 1) for i in pending)} 块生成失败，已成功的 {len(kept)} 块已保留，"
+                               f"再次生成时直接复用: {errors[pending[0]]}")
+        return results
+    
+    def _keep_partial_chunks(self, kept, paths):
+        """
+        保留生成失败时已成功的块供下次复用：kept 为 块的复用键 -> 文件路径，paths 为本次生成的全部块文件
+        文本相同的块只保留一个；超过 MAX_PARTIAL_CHUNKS 个时删除最早保留的块
+        """
+        with self._partial_chunks_lock:
+            replaced = [self.partial_chunks.pop(key, None) for key in kept]
+            self.partial_chunks.update(kept)
+            while len(self.partial_chunks) > self.MAX_PARTIAL_CHUNKS:
+                replaced.append(self.partial_chunks.popitem(last=False)[1])
+        keep = set(kept.values())
+        self._remove_files([path for path in list(paths) + replaced if path and path not in keep])
+    
+    def _remove_files(self, paths):
+        for path in paths:
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError:
+                pass
+    
+    def _server_pool(self, model_name):
+        """该标签页服务器列表对应的调度池；列表变化时重建（多个服务器时在后台定期探测）"""
+        servers = parse_server_list(self.tts_vars[model_name]['server_var'].get())
+        if not servers:
+            raise ValueError("请先填写服务地址")
+        with self._server_pools_lock:
+            pool = self.server_pools.get(model_name)
+            if pool is None or pool.servers != servers:
+                if pool is not None:
+                    pool.stop()
+                probe = self._probe_server if len(servers) > 1 else None
+                pool = ServerPool(servers, probe=probe, probe_interval=self.server_probe_seconds, log=self.log)
+                pool.start()
+                self.server_pools[model_name] = pool
+        return pool
+    
+    def _probe_server(self, server):
+        """健康探测：Gradio 的 /config 能正常返回即视为可用"""
+        return self.http.get(f"{server}/config", timeout=5).status_code < 500
+    
+    def _log_server_stats(self, model_name):
+        pool = self.server_pools.get(model_name)
+        if pool is None or len(pool.servers) < 2:
+            return
+        parts = [f"{server}: 完成 {st['completed']}, 失败 {st['failed']}{'' if st['healthy'] else '（不可用）'}"
+                 for server, st in pool.stats().items()]
+        self.log(f"[POOL] 服务器分配: {'; '.join(parts)}")
+    
+    def _get_parallel_chunks(self, model_vars):
+        """读取并行块数（1-MAX_PARALLEL_CHUNKS），输入框内容无效时为1"""
+        try:
+            value = int(model_vars['parallel_var'].get())
+        except (ValueError, TypeError, tk.TclError):
+            value = 1
+        return max(1, min(value, self.MAX_PARALLEL_CHUNKS))
+    
+    def _get_aligned_speed(self, model_vars):
+        """速度对齐到0.1的倍数（0.1-2.0），与请求中的 speed 参数一致"""
+        snapped = min(max(round(float(model_vars['speed_var'].get()) / 0.1) * 0.1, 0.1), 2.0)
+        return float(f"{snapped:.1f}")
+    
+    def _observe_speech_rate(self, server, model_name, speed, text, wav_path):
+        """用实际生成的音频时长更新语速模型，供下次分块使用"""
+        rate = self.rate_model.observe_wav(server, model_name, speed, text, wav_path)
+        if rate is not None:
+            self.log(f"[{model_name.upper()}] 语速模型已更新: {rate:.1f} 单位/秒 (speed={speed})")
 
+    def _job_ref_audio(self, model_name, job):
+        """任务提交时记录的参考音频；不经调度器调用时读取界面"""
+        if job is not None and job.data:
+            return job.data['ref_audio']
+        return self.tts_vars[model_name]['ref_audio_var'].get().strip()
+    
+    def _ref_audio_id(self, ref_audio):
+        """参考音频标识：本地文件用内容哈希，远程音频用 URL，未指定时为 None（使用示例音频）"""
+        if ref_audio and ref_audio.lower().startswith(("http://", "https://")):
+            return ref_audio
+        if ref_audio and os.path.isfile(ref_audio):
+            return "sha256:" + file_fingerprint(ref_audio)[3]
+        return None
+    
+    def _audio_cache_key(self, model_name, ref_audio, data_array):
+        """
+        音频缓存键（参考音频按 _ref_audio_id 标识）
+        ref_text 为空时服务器用转写文本生成，与直接发送该转写文本等价：有缓存的转写文本时按它计算，
+        下次自动填入转写文本后仍能命中
+        """
+        if self.audio_cache is None:
+            return None
+        if not data_array[1]:
+            transcript = self._cached_transcript(ref_audio)
+            if transcript:
+                data_array = [data_array[0], transcript] + list(data_array[2:])
+        return AudioCache.make_key(model_name, self._ref_audio_id(ref_audio) or "sample", data_array)
+    
+    def _cached_transcript(self, ref_audio):
+        """该参考音频此前由服务器转写的参考文本，没有时返回 None"""
+        ref_id = self._ref_audio_id(ref_audio)
+        return self.transcript_cache.get(ref_id) if ref_id else None
+    
+    def _store_transcript(self, model_name, ref_audio, text):
+        """保存服务器转写的参考文本，之后使用该参考音频时直接发送，服务器不必再转写"""
+        ref_id = self._ref_audio_id(ref_audio)
+        if ref_id and text and text.strip():
+            self.transcript_cache.put(ref_id, text)
+            self.log(f"[{model_name.upper()}][CACHE] 已缓存参考音频的转写文本: {text.strip()[:100]}")
+    
+    def _get_cached_audio(self, cache_key):
+        if cache_key is None:
+            return None
+        return self.audio_cache.get(cache_key)
+    
+    def _store_audio(self, cache_key, wav_path):
+        if cache_key is None:
+            return
+        try:
+            self.audio_cache.put(cache_key, wav_path)
+        except OSError as e:
+            self.log(f"[CACHE][ERROR] 保存音频缓存失败: {e}")
+    
+    def _handle_stale_upload(self, server, ref_audio, upload_path, error_data):
+        """
+        使用缓存的上传路径 upload_path 时服务器返回了 event: error：
+        明确是该文件不存在/路径无效时作废缓存并返回 True（调用方重新上传后重试）；
+        错误内容为空（服务器未开启 show_error）时无法判断，只作废缓存，下次生成重新上传，返回 False
+        """
+        if is_stale_upload_error(error_data, upload_path):
+            self.ref_upload_cache.invalidate(server, ref_audio)
+            return True
+        if error_data in ("", "null"):
+            self.ref_upload_cache.invalidate(server, ref_audio)
+        return False
+    
+    def _upload_ref_cached(self, server, local_path):
+        """
+        上传本地参考音频，同一服务器上未变化的文件直接复用上次上传的结果（两个标签页共用）
+        返回 (file_data, 是否来自缓存)
+        """
+        file_data, cached = self.ref_upload_cache.get_or_upload(server, local_path, self._upload_ref_to_gradio)
+        if cached:
+            self.log(f"[TTS][UPLOAD] 复用已上传的参考音频: {os.path.basename(local_path)} -> {file_data.get('path')}")
+        return file_data, cached
+    
     def _upload_ref_to_gradio(self, server: str, local_path: str):
         """将本地参考音频上传到 Gradio 缓存，返回 gradio.FileData 所需的 {path, meta} 结构。
         按照 F12 看到的格式：/gradio_api/upload?upload_id=xxx，使用 multipart/form-data，字段名为 files。
@@ -1573,7 +2369,7 @@ class TextFormatter:
             with open(local_path, 'rb') as fh:
                 mime = 'audio/mpeg' if local_path.lower().endswith('.mp3') else 'audio/wav'
                 files = {'files': (filename, fh, mime)}
-                resp = requests.post(upload_url, files=files, timeout=60)
+                resp = self.http.post(upload_url, files=files, timeout=60)
             resp.raise_for_status()
             
             # 从 F12 Response 看，返回的是 JSON 字符串数组，例如：["C:\\Users\\...\\tts.mp3"]
@@ -1761,6 +2557,46 @@ class TextFormatter:
                             model_vars['crossfade_var'].set(model_config['crossfade'])
                         if 'auto_save_dir' in model_config:
                             model_vars['auto_save_dir_var'].set(model_config['auto_save_dir'])
+                        if 'progressive_playback' in model_config:
+                            model_vars['progressive_var'].set(model_config['progressive_playback'])
+                        if 'parallel_chunks' in model_config:
+                            model_vars['parallel_var'].set(model_config['parallel_chunks'])
+                    
+                    # 恢复发音词典
+                    if config.get('lexicon_path') and os.path.isfile(config['lexicon_path']):
+                        self.set_lexicon(config['lexicon_path'])
+                    
+                    # 恢复实时预览防抖时间
+                    if 'preview_debounce_ms' in config:
+                        self.preview_debounce_ms = int(config['preview_debounce_ms'])
+                    
+                    # 恢复TTS分块目标时长
+                    if 'chunk_target_seconds' in config:
+                        self.chunk_target_seconds = float(config['chunk_target_seconds'])
+                    if 'first_chunk_seconds' in config:
+                        self.first_chunk_seconds = float(config['first_chunk_seconds'])
+                    
+                    # 恢复转换结果缓存容量
+                    if 'conversion_cache_mb' in config:
+                        self.conversion_cache_mb = float(config['conversion_cache_mb'])
+                    
+                    # 恢复每个服务器的HTTP连接数
+                    if 'http_pool_size' in config:
+                        self.http_pool_size = max(1, int(config['http_pool_size']))
+                    if 'server_concurrency' in config:
+                        self.server_concurrency = max(1, int(config['server_concurrency']))
+                    if 'ref_upload_ttl_hours' in config:
+                        self.ref_upload_ttl_hours = float(config['ref_upload_ttl_hours'])
+                    if 'audio_cache_mb' in config:
+                        self.audio_cache_mb = float(config['audio_cache_mb'])
+                    if 'server_probe_seconds' in config:
+                        self.server_probe_seconds = max(1.0, float(config['server_probe_seconds']))
+                    
+                    # 恢复任务并发上限
+                    if 'max_running_jobs' in config:
+                        self.max_running_jobs = max(1, int(config['max_running_jobs']))
+                    if 'max_jobs_per_model' in config:
+                        self.max_jobs_per_model = max(1, int(config['max_jobs_per_model']))
                 else:
                     # 旧版格式：只有一个模型（F5-TTS）的配置，需要迁移
                     # 恢复服务器地址（只恢复到F5-TTS，如果有的话）
@@ -1808,7 +2644,20 @@ class TextFormatter:
     def save_config(self):
         """保存当前设置到配置文件"""
         try:
-            config = {}
+            config = {
+                'lexicon_path': self.lexicon_path,
+                'preview_debounce_ms': self.preview_debounce_ms,
+                'conversion_cache_mb': self.conversion_cache_mb,
+                'chunk_target_seconds': self.chunk_target_seconds,
+                'first_chunk_seconds': self.first_chunk_seconds,
+                'http_pool_size': self.http_pool_size,
+                'server_concurrency': self.server_concurrency,
+                'ref_upload_ttl_hours': self.ref_upload_ttl_hours,
+                'audio_cache_mb': self.audio_cache_mb,
+                'server_probe_seconds': self.server_probe_seconds,
+                'max_running_jobs': self.max_running_jobs,
+                'max_jobs_per_model': self.max_jobs_per_model
+            }
             
             # 保存每个模型的独立配置
             for model_name in ['f5tts', 'e2tts']:
@@ -1827,7 +2676,9 @@ class TextFormatter:
                     'speed': model_vars['speed_var'].get(),
                     'nfe_steps': model_vars['nfe_steps_var'].get(),
                     'crossfade': model_vars['crossfade_var'].get(),
-                    'auto_save_dir': model_vars['auto_save_dir_var'].get()
+                    'auto_save_dir': model_vars['auto_save_dir_var'].get(),
+                    'progressive_playback': model_vars['progressive_var'].get(),
+                    'parallel_chunks': self._get_parallel_chunks(model_vars)
                 }
             
             with open(self.config_file, 'w', encoding='utf-8') as f:
@@ -1890,6 +2741,16 @@ def main():
     root = tk.Tk()
     app = TextFormatter(root)
     root.mainloop()
+    # 任务已在 on_close 中取消并等待结束，此时再关闭共享的连接和缓存
+    if app.conversion_cache is not None:
+        app.conversion_cache.close()
+    for pool in app.server_pools.values():
+        pool.stop()
+    app.http.close()
+    if app.tts_client is not None:
+        app.tts_client.close()
+    # 退出后不会再复用生成失败时保留的块
+    app._remove_files(app.partial_chunks.values())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,304 @@
+# 文本规范化核心（不依赖 tkinter / requests / pydub）
+# 供 GUI、命令行、进程池 worker 和服务端直接导入使用
+
+import re
+from itertools import chain
+
+from number_speller import (
+    number_to_words, year_to_words, digits_to_words, digits_to_ordinal, digits_to_digit_words,
+)
+
+__all__ = [
+    "RULES_VERSION",
+    "number_to_words",
+    "is_year",
+    "convert_number",
+    "normalize_text",
+    "normalize_lines",
+    "iter_chunk_spans",
+    "split_text_into_chunks",
+]
+
+# 转换规则版本：修改任何转换规则时加1，使转换结果缓存失效
+RULES_VERSION = 3
+
+# 单遍扫描器：所有数字形式合并为一个预编译的正则，从左到右只扫描一次，
+# 按命中的分组名分发给对应的处理函数。分支顺序即优先级（先长后短、先具体后一般）。
+_TOKEN_PATTERNS = [
+    # 金额：$40、$1,200、$3.50
+    ("money", r'\$(?P<money_int>\d{1,3}(?:,\d{3})+|\d+)(?:\.(?P<money_frac>\d+))?\b'),
+    # 百分比：25%、3.5%
+    ("percent", r'\b(?P<pct_int>\d{1,3}(?:,\d{3})+|\d+)(?:\.(?P<pct_frac>\d+))?%'),
+    # 时间：10:30、9:05
+    ("time", r'\b(?P<hour>[01]?\d|2[0-3]):(?P<minute>[0-5]\d)\b(?!:\d)'),
+    # 范围：两端量级相同才算，年份-年份（1990-1995）或三位以内的数（10–20）；
+    # 555-1234 这类电话号码、2023-10 和 2023-10-05 这类日期不算，后面还有一组的（555-123-4567）也不算
+    ("range", r'(?<![\d.][-\u2013])\b(?:(?P<range_a>\d{1,3})(?P<range_sep>[-\u2013])(?P<range_b>\d{1,3})'
+              r'|(?P<range_ya>1\d{3}|20\d{2})(?P<range_ysep>[-\u2013])(?P<range_yb>1\d{3}|20\d{2}))\b(?![-\u2013.]\d)'),
+    # 千分位：1,200、12,345,678.9
+    ("grouped", r'\b(?P<grp_int>\d{1,3}(?:,\d{3})+)(?:\.(?P<grp_frac>\d+))?(?P<grp_suffix>[a-zA-Z]*)\b'),
+    # 小数：3.5（排除 1.2.3 这类版本号）
+    ("decimal", r'(?<!\d\.)\b(?P<dec_int>\d+)\.(?P<dec_frac>\d+)\b(?!\.\d)'),
+    # 序数：1st、2nd、3rd、4th
+    ("ordinal", r'\b(?P<ord_num>\d+)(?i:st|nd|rd|th)\b'),
+    # 年份：四位数（可带后缀，如 1990s）
+    ("year", r'\b0*(?P<year_num>[1-9]\d{3})(?P<year_suffix>[a-zA-Z]*)\b'),
+    # 基数：其他数字，包括可能的后缀（如s等）
+    ("cardinal", r'\b(?P<card_num>\d+)(?P<card_suffix>[a-zA-Z]*)\b'),
+]
+# 前置断言：只在数字或 $ 处才尝试各个分支，其余位置一次判断即跳过
+TOKEN_PATTERN = re.compile(r"(?=[\d$])(?:" + "|".join(f"(?P<{name}>{pattern})" for name, pattern in _TOKEN_PATTERNS) + ")")
+
+
+def is_year(num):
+    """判断是否为年份（1900-2099）"""
+    return 1900 <= num <= 2099
+
+
+def convert_number(num_str, suffix=""):
+    """转换单个数字串（可带后缀），四位数按年份格式处理"""
+    num_str = num_str.lstrip("0")  # 去掉前导0，不转int
+    if len(num_str) == 4:
+        result = year_to_words(int(num_str))
+    else:
+        # 其他数字按数字串分组转换，任意长度都不经过大整数运算
+        result = digits_to_words(num_str)
+    return result + suffix
+
+
+def _decimal_words(int_digits, frac_digits):
+    """小数读法：整数部分按基数读，小数部分逐位读，例如 3.14 -> three point one four"""
+    words = digits_to_words(int_digits.replace(",", ""))
+    if frac_digits:
+        words += " point " + digits_to_digit_words(frac_digits)
+    return words
+
+
+def _handle_money(m):
+    int_digits = m.group("money_int").replace(",", "")
+    frac = m.group("money_frac")
+    if frac and len(frac) != 2:
+        return _decimal_words(int_digits, frac) + " dollars"
+    parts = []
+    if int_digits.lstrip("0") or not frac or not frac.lstrip("0"):
+        unit = "dollar" if int_digits.lstrip("0") == "1" else "dollars"
+        parts.append(f"{digits_to_words(int_digits)} {unit}")
+    if frac and frac.lstrip("0"):
+        unit = "cent" if frac == "01" else "cents"
+        parts.append(f"{digits_to_words(frac)} {unit}")
+    return " ".join(parts)
+
+
+def _handle_percent(m):
+    return _decimal_words(m.group("pct_int"), m.group("pct_frac")) + " percent"
+
+
+def _handle_time(m):
+    hour = digits_to_words(m.group("hour"))
+    minute = m.group("minute")
+    if minute == "00":
+        return f"{hour} o'clock"
+    if minute[0] == "0":
+        return f"{hour} oh {digits_to_words(minute)}"
+    return f"{hour} {digits_to_words(minute)}"
+
+
+def _handle_range(m):
+    if m.group("range_a") is not None:
+        return f"{convert_number(m.group('range_a'))} to {convert_number(m.group('range_b'))}"
+    start, end = m.group("range_ya"), m.group("range_yb")
+    if end < start:
+        # 结束年份早于开始年份（如 1555-1234），不是年份范围，两段各自按数字读
+        return f"{convert_number(start)}{m.group('range_ysep')}{convert_number(end)}"
+    return f"{convert_number(start)} to {convert_number(end)}"
+
+
+def _handle_grouped(m):
+    return _decimal_words(m.group("grp_int"), m.group("grp_frac")) + m.group("grp_suffix")
+
+
+def _handle_decimal(m):
+    return _decimal_words(m.group("dec_int"), m.group("dec_frac"))
+
+
+def _handle_ordinal(m):
+    return digits_to_ordinal(m.group("ord_num"))
+
+
+def _handle_year(m):
+    return year_to_words(int(m.group("year_num"))) + m.group("year_suffix")
+
+
+def _handle_cardinal(m):
+    return convert_number(m.group("card_num"), m.group("card_suffix"))
+
+
+_HANDLERS = {
+    "money": _handle_money,
+    "percent": _handle_percent,
+    "time": _handle_time,
+    "range": _handle_range,
+    "grouped": _handle_grouped,
+    "decimal": _handle_decimal,
+    "ordinal": _handle_ordinal,
+    "year": _handle_year,
+    "cardinal": _handle_cardinal,
+}
+
+
+def _replace_token(match):
+    # 外层命名分组最后闭合，lastgroup 即命中的类型
+    return _HANDLERS[match.lastgroup](match)
+
+
+def normalize_text(text, lexicon=None):
+    """
+    将文本中的所有数字（金额、百分比、时间、范围、小数、序数、年份等）转换为英文
+    lexicon 为 pronunciation_lexicon.Lexicon 时，先按自定义发音词典替换
+    """
+    if lexicon is not None:
+        text = lexicon.apply(text)
+    return TOKEN_PATTERN.sub(_replace_token, text)
+
+
+def normalize_lines(lines, unit="line", lexicon=None, cache=None):
+    """
+    流式转换：逐行（unit="line"）或逐段（unit="paragraph"，以空行分段）读取，
+    逐块产出转换后的文本；内存占用只与单行/单段大小有关，与文件总大小无关
+    数字不会跨行，因此两种方式的结果与整篇一次转换完全相同
+    cache 为 conversion_cache.ConversionCache 时，重复出现的行/段直接取缓存结果
+    """
+    convert = cache.convert if cache is not None else normalize_text
+    if unit == "line":
+        for line in lines:
+            yield convert(line, lexicon)
+        return
+    if unit != "paragraph":
+        raise ValueError(f"未知的分块方式: {unit}")
+
+    paragraph = []
+    for line in lines:
+        paragraph.append(line)
+        if not line.strip():
+            yield convert("".join(paragraph), lexicon)
+            paragraph = []
+    if paragraph:
+        yield convert("".join(paragraph), lexicon)
+
+
+# 分块用的边界：段落（空行）、句末标点后的空白、单词
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+_SENTENCE_END = re.compile(r'[.!?]\s+')
+_WORD = re.compile(r'\S+')
+
+
+def _trim_span(text, start, end):
+    """去掉区间首尾的空白，返回新的 (start, end)"""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _split_long_paragraph(text, start, end, max_chars, size):
+    """超长段落按句子分块，单个句子仍超长时按单词分块；区间只记偏移，不拼接字符串"""
+    span_start = None
+    span_end = None
+    pos = start
+    for m in chain(_SENTENCE_END.finditer(text, start, end), (None,)):
+        s = pos
+        e = pos = m.end() if m is not None else end
+        if s == e:
+            continue
+        if span_start is not None and size(span_start, e) <= max_chars:
+            span_end = e
+            continue
+        if span_start is not None:
+            yield span_start, span_end
+            span_start = None
+        if size(s, e) <= max_chars:
+            span_start, span_end = s, e
+            continue
+        # 单个句子超长：按单词分块，剩下的单词作为当前块继续接后面的句子
+        for m in _WORD.finditer(text, s, e):
+            if span_start is not None and size(span_start, m.end()) <= max_chars:
+                span_end = m.end()
+            else:
+                if span_start is not None:
+                    yield span_start, span_end
+                span_start, span_end = m.start(), m.end()
+    if span_start is not None:
+        yield span_start, span_end
+
+
+def _iter_spans(text, start, max_size, size):
+    """从 start 开始规划分块（段落 -> 句子 -> 单词），逐个产出去掉首尾空白的 (start, end)"""
+    chunk_start = None
+    chunk_end = None
+    pos = start
+    for m in chain(_PARAGRAPH_BREAK.finditer(text, start), (None,)):
+        if m is None:
+            para_start, para_end = _trim_span(text, pos, len(text))
+        else:
+            para_start, para_end = _trim_span(text, pos, m.start())
+            pos = m.end()
+        if para_start == para_end:
+            continue
+        if size(para_start, para_end) > max_size:
+            # 超长段落单独分块，先交出当前块
+            if chunk_start is not None:
+                yield chunk_start, chunk_end
+                chunk_start = None
+            for span in _split_long_paragraph(text, para_start, para_end, max_size, size):
+                span = _trim_span(text, *span)
+                if span[0] < span[1]:
+                    yield span
+        elif chunk_start is not None and size(chunk_start, para_end) <= max_size:
+            chunk_end = para_end
+        else:
+            if chunk_start is not None:
+                yield chunk_start, chunk_end
+            chunk_start, chunk_end = para_start, para_end
+    if chunk_start is not None:
+        yield chunk_start, chunk_end
+
+
+def iter_chunk_spans(text: str, max_chars_per_chunk: int = 3000, cost=None, first_chunk_max=None):
+    """
+    一次线性扫描规划分块边界，逐个产出 (start, end) 偏移，text[start:end] 即一个块（已去掉首尾空白）
+    优先在段落边界分割，其次在句子边界，最后在单词边界；块内保留原文的分隔空白
+    只有单个单词超过上限时，块才会超过 max_chars_per_chunk
+    cost 为前缀和列表时（如 duration_model.prefix_units），按 cost[end] - cost[start] 而不是字符数衡量块大小
+    first_chunk_max 小于上限时，第一块单独按这个更小的上限规划（边生成边播放时尽快拿到第一段音频）
+    """
+    if cost is None:
+        def size(start, end):
+            return end - start
+    else:
+        def size(start, end):
+            return cost[end] - cost[start]
+
+    start = 0
+    if first_chunk_max is not None and first_chunk_max < max_chars_per_chunk:
+        if size(0, len(text)) <= first_chunk_max:
+            yield 0, len(text)
+            return
+        first = next(_iter_spans(text, 0, first_chunk_max, size), None)
+        if first is None:
+            return
+        yield first
+        start = first[1]
+    elif size(0, len(text)) <= max_chars_per_chunk:
+        yield 0, len(text)
+        return
+    yield from _iter_spans(text, start, max_chars_per_chunk, size)
+
+
+def split_text_into_chunks(text: str, max_chars_per_chunk: int = 3000) -> list:
+    """
+    将文本智能分割成多个块
+    优先在段落边界分割，其次在句子边界分割（边界由 iter_chunk_spans 规划）
+    """
+    chunks = [text[start:end] for start, end in iter_chunk_spans(text, max_chars_per_chunk)]
+    return chunks if chunks else [text]
@@ -0,0 +1,102 @@
+"""
+检查长文本重复生成时每一块都命中音频缓存（不依赖 Tk，也不需要服务器）
+
+按界面中相同的方式规划分块（duration_model + text_normalizer.iter_chunk_spans），
+每块"生成"一段时长带随机波动的音频并更新语速模型，与真实服务器一样；
+然后用同样的文本再生成若干次，要求分块不变、每一块都命中 AudioCache。
+
+用法：
+    python tools/check_chunk_cache.py
+    python tools/check_chunk_cache.py --runs 10 --noise 0.15 --target-seconds 20
+
+全部命中时退出码为 0，否则输出未命中的块并返回 1。
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import text_normalizer  # noqa: E402
+from duration_model import DEFAULT_UNITS_PER_SEC, SpeechRateModel, prefix_units, speech_units  # noqa: E402
+from tts_cache import AudioCache  # noqa: E402
+
+SERVER = "http://127.0.0.1:7860"
+MODEL = "f5tts"
+MAX_CHARS_PER_CHUNK = 3000
+
+
+def make_script(rng, paragraphs=40):
+    return "\n\n".join(
+        " ".join(f"Sentence {i}.{j} has some words, and a pause." for j in range(rng.randint(5, 30)))
+        for i in range(paragraphs))
+
+
+def plan(text, rate_model, target_seconds, speed):
+    """与 TextFormatter._call_tts_for_model 相同的分块规划"""
+    units = prefix_units(text)
+    max_units = min(MAX_CHARS_PER_CHUNK, rate_model.max_units(target_seconds, SERVER, MODEL, speed))
+    return list(text_normalizer.iter_chunk_spans(text, max_units, cost=units))
+
+
+def write_wav(path, seconds):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(8000)
+        w.writeframes(b"\0\0" * int(8000 * seconds))
+
+
+def generate(text, spans, cache, rate_model, rng, noise, speed, tmp_dir):
+    """逐块查缓存，未命中时"生成"并写入缓存、更新语速模型；返回未命中的块序号"""
+    missed = []
+    for i, (start, end) in enumerate(spans):
+        chunk = text[start:end]
+        key = AudioCache.make_key(MODEL, "sha256:check", [None, "ref", chunk, False, False, 1, 0.15, 32, speed])
+        cached = cache.get(key)
+        if cached:
+            os.remove(cached)
+            continue
+        missed.append(i)
+        seconds = speech_units(chunk) / (DEFAULT_UNITS_PER_SEC * speed * rng.uniform(1 - noise, 1 + noise))
+        path = os.path.join(tmp_dir, f"chunk_{i}.wav")
+        write_wav(path, seconds)
+        cache.put(key, path)
+        rate_model.observe_wav(SERVER, MODEL, speed, chunk, path)
+        os.remove(path)
+    return missed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="检查相同长文本重复生成时每一块都命中音频缓存")
+    parser.add_argument("--runs", type=int, default=5, help="第一次之后再生成的次数")
+    parser.add_argument("--noise", type=float, default=0.1, help="每块音频时长的随机波动比例")
+    parser.add_argument("--target-seconds", type=float, default=20, help="每块的目标时长（秒）")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    text = make_script(rng)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = AudioCache(os.path.join(tmp_dir, "audio"))
+        rate_model = SpeechRateModel(None)
+        first = plan(text, rate_model, args.target_seconds, args.speed)
+        generate(text, first, cache, rate_model, rng, args.noise, args.speed, tmp_dir)
+        failed = False
+        for run in range(1, args.runs + 1):
+            spans = plan(text, rate_model, args.target_seconds, args.speed)
+            missed = generate(text, spans, cache, rate_model, rng, args.noise, args.speed, tmp_dir)
+            status = "ok" if not missed and spans == first else "FAIL"
+            print(f"第 {run} 次重复生成: {len(spans)} 块, 未命中 {len(missed)} 块, 分块{'不变' if spans == first else '已变化'} [{status}]")
+            if missed:
+                print(f"  未命中的块: {', '.join(str(i + 1) for i in missed)}")
+            failed = failed or status != "ok"
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+F5-TTS Gradio 接口的本地替身（只用标准库），用于离线测试多服务器调度、故障转移、流式结果和各类缓存
+
+实现的接口（与客户端用到的部分一致）：
+    GET  /config                                   健康探测
+    POST /gradio_api/upload?upload_id=...          上传参考音频，返回 ["<路径>"]
+    POST /gradio_api/call/basic_tts                提交任务，返回 {"event_id": ...}
+    GET  /gradio_api/call/basic_tts/<event_id>     结果事件流（event: complete，data 为 [音频, null, 参考文本]）
+    GET  /gradio_api/file=<路径>                   下载生成的 WAV（静音，时长按文本长度和语速估算）
+
+用法：
+    python tools/fake_f5tts_server.py --port 7861 --delay 2
+    python tools/fake_f5tts_server.py --port 7862 --fail-rate 0.3      # 30% 的任务返回 event: error
+    python tools/fake_f5tts_server.py --port 7863 --no-stream          # 不支持流式，客户端退回轮询
+
+多开几个端口，在界面的服务地址中用逗号分隔填写即可测试调度和故障转移。
+"""
+import argparse
+import io
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+SAMPLE_RATE = 24000
+# 与 duration_model 的默认语速接近：约 15 字符/秒（speed=1.0）
+CHARS_PER_SEC = 15.0
+
+
+def silent_wav(seconds):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(b"\0\0" * int(SAMPLE_RATE * seconds))
+    return buf.getvalue()
+
+
+class FakeState:
+    def __init__(self, delay, fail_rate, stream, transcript):
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.stream = stream
+        self.transcript = transcript
+        self.lock = threading.Lock()
+        self.jobs = {}      # event_id -> {"submitted": 时间, "data": 参数, "fail": 是否失败}
+        self.files = {}     # 路径 -> WAV 字节
+        self.uploads = 0
+        self.calls = 0
+
+
+class FakeF5TTSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None  # 由 make_server 设置
+
+    def log_message(self, fmt, *args):
+        sys.stderr.write(f"[FAKE:{self.server.server_port}] {fmt % args}\n")
+
+    def _send(self, body, content_type="application/json", status=200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, obj, status=200):
+        self._send(json.dumps(obj, ensure_ascii=False).encode("utf-8"), status=status)
+
+    def _write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_GET(self):
+        path = unquote(self.path)
+        if path.startswith("/config"):
+            return self._send_json({"version": "fake", "mode": "blocks"})
+        if path.startswith("/gradio_api/file="):
+            with self.state.lock:
+                body = self.state.files.get(path[len("/gradio_api/file="):])
+            if body is None:
+                return self._send_json({"detail": "File not found"}, status=404)
+            return self._send(body, "audio/wav")
+        m = re.match(r"^/gradio_api/call/[\w-]+/(\w+)$", path)
+        if m:
+            return self._stream_result(m.group(1))
+        self._send_json({"detail": "Not Found"}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if self.path.startswith("/gradio_api/upload"):
+            with self.state.lock:
+                self.state.uploads += 1
+                uploaded = f"/tmp/gradio/fake_upload_{self.state.uploads}.wav"
+            return self._send_json([uploaded])
+        if re.match(r"^/gradio_api/call/[\w-]+$", self.path):
+            try:
+                data = json.loads(body)["data"]
+            except (ValueError, KeyError, TypeError):
+                return self._send_json({"detail": "invalid body"}, status=422)
+            event_id = uuid.uuid4().hex
+            with self.state.lock:
+                self.state.calls += 1
+                self.state.jobs[event_id] = {"submitted": time.time(), "data": data,
+                                             "fail": random.random() < self.state.fail_rate}
+            return self._send_json({"event_id": event_id})
+        self._send_json({"detail": "Not Found"}, status=404)
+
+    def _result_event(self, event_id, job):
+        if job["fail"]:
+            return "event: error\ndata: null\n\n"
+        data = job["data"]
+        gen_text = data[2] if len(data) > 2 else ""
+        speed = float(data[8]) if len(data) > 8 and data[8] else 1.0
+        seconds = max(0.5, len(gen_text) / CHARS_PER_SEC / speed)
+        file_path = f"/tmp/gradio/fake_{event_id}.wav"
+        with self.state.lock:
+            self.state.files[file_path] = silent_wav(seconds)
+        host = self.headers.get("Host", f"127.0.0.1:{self.server.server_port}")
+        audio = {"path": file_path, "url": f"http://{host}/gradio_api/file={file_path}",
+                 "meta": {"_type": "gradio.FileData"}}
+        ref_text = (data[1] if len(data) > 1 else "") or self.state.transcript
+        return "event: complete\ndata: " + json.dumps([audio, None, ref_text], ensure_ascii=False) + "\n\n"
+
+    def _stream_result(self, event_id):
+        with self.state.lock:
+            job = self.state.jobs.get(event_id)
+        if job is None:
+            return self._send_json({"detail": "Unknown event"}, status=404)
+        remaining = self.state.delay - (time.time() - job["submitted"])
+        if not self.state.stream:
+            # 不支持流式：只返回当前状态，客户端间隔后再次请求
+            body = "event: generating\ndata: null\n\n" if remaining > 0 else self._result_event(event_id, job)
+            return self._send(body.encode("utf-8"), "text/event-stream")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self._write_chunk("event: generating\ndata: null\n\n")
+        while remaining > 0:
+            time.sleep(min(remaining, 5.0))
+            remaining = self.state.delay - (time.time() - job["submitted"])
+            if remaining > 0:
+                self._write_chunk("event: heartbeat\ndata: null\n\n")
+        self._write_chunk(self._result_event(event_id, job))
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def make_server(port=7860, host="127.0.0.1", delay=1.0, fail_rate=0.0, stream=True,
+                transcript="This is a fake transcript."):
+    """创建替身服务器（尚未开始服务）；port 为 0 时自动选择端口"""
+    state = FakeState(delay, fail_rate, stream, transcript)
+    handler = type("Handler", (FakeF5TTSHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = state
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="F5-TTS Gradio 接口的本地替身服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7860)
+    parser.add_argument("--delay", type=float, default=1.0, help="每个任务的生成时间（秒）")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="返回 event: error 的任务比例（0-1）")
+    parser.add_argument("--no-stream", action="store_true", help="不流式返回结果（客户端退回轮询）")
+    parser.add_argument("--transcript", default="This is a fake transcript.", help="参考文本为空时返回的转写结果")
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.host, args.delay, args.fail_rate, not args.no_stream, args.transcript)
+    print(f"Fake F5-TTS server on http://{args.host}:{server.server_port} "
+          f"(delay={args.delay}s, fail_rate={args.fail_rate}, stream={not args.no_stream})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
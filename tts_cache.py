@@ -0,0 +1,286 @@
+# TTS 请求相关的缓存（不依赖 Tk）
+# RefUploadCache: 本地参考音频上传到 Gradio 后返回的 gradio.FileData，按 服务器 + 文件指纹 缓存，
+# 分块生成和之后使用同一参考音频的任务不再重复上传。
+# AudioCache: 生成的音频按请求内容（文本、模型、参考音频、全部参数）寻址保存在磁盘上，
+# 未改动的块直接从本地取回，不再请求服务器；总大小超过上限时淘汰最久未使用的文件。
+# TranscriptCache: 参考音频（按内容哈希）-> 服务器用 Whisper 转写的参考文本，ref_text 为空时直接发送缓存的转写。
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from tts_http import SessionPool
+
+
+def _save_json_atomic(path, data):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tts_cache_", suffix=".tmp", dir=directory)
+    with open(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def file_sha256(path, block_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# (绝对路径, 大小, 修改时间) -> sha256，文件未变化时不重复计算哈希
+_fingerprints = {}
+_fingerprints_lock = threading.Lock()
+
+
+def file_fingerprint(path):
+    """返回 (绝对路径, 大小, 修改时间ns, sha256)"""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    stamp = (path, st.st_size, st.st_mtime_ns)
+    with _fingerprints_lock:
+        digest = _fingerprints.get(stamp)
+    if digest is None:
+        digest = file_sha256(path)
+        with _fingerprints_lock:
+            _fingerprints[stamp] = digest
+    return stamp + (digest,)
+
+
+# 服务器拒绝已失效的上传路径时，错误内容中出现的关键词：FileNotFoundError / "No such file"（文件已被清理）
+# 和 Gradio 的 InvalidPathError（消息为 "Cannot move <路径> to the gradio cache dir ..."）；
+# "not found" 之类的泛泛说法也会出现在无关的错误中，不算
+STALE_UPLOAD_MARKERS = ("filenotfounderror", "no such file", "invalidpatherror", "cannot move")
+
+
+def is_stale_upload_error(data, upload_path):
+    """服务器 event: error 的内容是否表示 upload_path 这个上传文件已不存在：须是文件类错误，且提到该文件名"""
+    text = (data or "").lower()
+    name = (upload_path or "").replace("\\", "/").rstrip("/").rsplit("/", 1)[-1].lower()
+    return bool(name) and name in text and any(marker in text for marker in STALE_UPLOAD_MARKERS)
+
+
+class RefUploadCache:
+    """
+    path: 持久化的 JSON 文件（None 时只在内存中）
+    ttl: 上传结果的有效期（秒），应不超过服务器清理上传文件的周期；服务器提前清理时由调用方 invalidate
+    """
+
+    def __init__(self, path=None, ttl=12 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.isfile(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self._entries = data
+            except (OSError, ValueError):
+                pass
+
+    def key(self, server, local_path):
+        """服务器 + 路径 + 大小 + 修改时间 + 内容哈希"""
+        return "|".join([SessionPool.server_key(server)] + [str(v) for v in file_fingerprint(local_path)])
+
+    def get(self, server, local_path):
+        """返回未过期的 gradio.FileData，没有时返回 None"""
+        key = self.key(server, local_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.time() - entry["uploaded_at"] < self.ttl:
+                return entry["file_data"]
+        return None
+
+    def put(self, server, local_path, file_data):
+        key = self.key(server, local_path)
+        with self._lock:
+            self._entries[key] = {"file_data": file_data, "uploaded_at": time.time()}
+            self._save_locked()
+
+    def invalidate(self, server, local_path):
+        """服务器拒绝了缓存的路径（已被清理）时调用"""
+        key = self.key(server, local_path)
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._save_locked()
+
+    def get_or_upload(self, server, local_path, upload):
+        """
+        返回 (file_data, 是否来自缓存)；没有缓存时调用 upload(server, local_path) 上传
+        同一文件的并发请求只上传一次（并行生成的各块同时开始时）
+        """
+        key = self.key(server, local_path)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            file_data = self.get(server, local_path)
+            if file_data is not None:
+                with self._lock:
+                    self.hits += 1
+                return file_data, True
+            file_data = upload(server, local_path)
+            self.put(server, local_path, file_data)
+            with self._lock:
+                self.misses += 1
+            return file_data, False
+
+    def _save_locked(self):
+        if not self.path:
+            return
+        # 顺便清理过期的条目
+        now = time.time()
+        self._entries = {k: v for k, v in self._entries.items() if now - v["uploaded_at"] < self.ttl}
+        try:
+            _save_json_atomic(self.path, self._entries)
+        except OSError:
+            pass
+
+
+class AudioCache:
+    """
+    directory: 保存 WAV 的目录，文件名为内容键（<key>.wav），文件的修改时间即最近使用时间
+    max_bytes: 目录总大小上限，超出时按最近使用时间淘汰到上限的 90%
+    """
+
+    def __init__(self, directory, max_bytes=1024 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._total = sum(size for _, size, _ in self._scan())
+
+    @staticmethod
+    def make_key(model_name, ref_audio_id, data_array):
+        """
+        data_array: 发给 basic_tts 的参数 [参考音频, ref_text, gen_text, remove_silences, randomize_seed, seed,
+        crossfade, nfe_steps, speed]；ref_audio_id 代替参考音频（本地文件用内容哈希，远程音频用 URL）
+        随机种子时不计入 seed
+        """
+        _, ref_text, gen_text, remove_silences, randomize, seed, crossfade, nfe_steps, speed = data_array
+        fields = [model_name, ref_audio_id, ref_text, gen_text, bool(remove_silences), bool(randomize),
+                  None if randomize else int(seed), float(crossfade), int(nfe_steps), float(speed)]
+        return hashlib.sha256(json.dumps(fields, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".wav")
+
+    def _scan(self):
+        """[(路径, 大小, 修改时间)]"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".wav"):
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, st.st_size, st.st_mtime))
+        return entries
+
+    def get(self, key):
+        """命中时把缓存的音频复制到新的临时文件并返回其路径（调用方可随意删除），未命中返回 None"""
+        path = self._path(key)
+        if os.path.exists(path):
+            fd, tmp_path = tempfile.mkstemp(prefix="f5tts_cached_", suffix=".wav")
+            os.close(fd)
+            try:
+                shutil.copyfile(path, tmp_path)
+                os.utime(path)
+            except OSError:
+                # 刚被淘汰
+                os.remove(tmp_path)
+                tmp_path = None
+        else:
+            tmp_path = None
+        if tmp_path is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return tmp_path
+
+    def put(self, key, wav_path):
+        """把生成的音频复制进缓存（wav_path 本身不变）"""
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(prefix=".audio_", suffix=".tmp", dir=self.directory)
+        os.close(fd)
+        try:
+            shutil.copyfile(wav_path, tmp_path)
+            size = os.path.getsize(tmp_path)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self._total += size - old_size
+            if self._total > self.max_bytes:
+                self._evict_locked()
+
+    def _evict_locked(self):
+        entries = sorted(self._scan(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._total = total
+
+
+class TranscriptCache:
+    """
+    path: 持久化的 JSON 文件，格式 {"参考音频标识": {"text": "...", "updated_at": 1700000000.0}}
+    参考音频标识：本地文件为 "sha256:<内容哈希>"，远程音频为 URL
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        if path and os.path.isfile(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self._entries = data
+            except (OSError, ValueError):
+                pass
+
+    def get(self, ref_id):
+        with self._lock:
+            entry = self._entries.get(ref_id)
+        return entry["text"] if entry else None
+
+    def put(self, ref_id, text):
+        text = (text or "").strip()
+        if not text:
+            return
+        with self._lock:
+            entry = self._entries.get(ref_id)
+            if entry and entry["text"] == text:
+                return
+            self._entries[ref_id] = {"text": text, "updated_at": time.time()}
+            if self.path:
+                try:
+                    _save_json_atomic(self.path, self._entries)
+                except OSError:
+                    pass
@@ -0,0 +1,164 @@
+# F5-TTS / E2TTS 的 HTTP 连接池（不依赖 Tk）
+# 每个服务器（scheme://host:port）一个 requests.Session，保持长连接：
+# 上传、提交、轮询、下载复用同一批 TCP/TLS 连接；连接失败时自动重试。
+# 统计新建连接数和请求数，复用数 = 请求数 - 新建连接数。
+# 生成结果以服务器推送事件（SSE）流式读取，收到结束事件立即返回，不再每 2 秒轮询一次。
+
+import json
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Gradio 结果流中表示任务已结束的事件
+TERMINAL_EVENTS = ("complete", "error")
+
+
+def event_error_data(text):
+    """结果流原始内容中 event: error 的 data 内容，没有错误事件时返回 None"""
+    m = re.search(r"event:\s*error\s*\n\s*data:\s*(.*)", text or "")
+    return m.group(1).strip() if m else None
+
+
+class ServerEventError(RuntimeError):
+    """结果流返回了 event: error；data 为服务器给出的错误内容（未开启 show_error 时为 "null"）"""
+
+    def __init__(self, data):
+        super().__init__(f"服务器返回错误: {data}")
+        self.data = data
+
+
+def is_terminal_message(data):
+    """旧版 Gradio 队列格式：data 行是 {"msg": "process_completed", ...} 形式的 JSON"""
+    if '"process_completed"' not in data:
+        return False
+    try:
+        msg = json.loads(data)
+    except ValueError:
+        return False
+    return isinstance(msg, dict) and msg.get("msg") == "process_completed"
+
+
+class SessionPool:
+    """
+    pool_size: 每个服务器最多保持的连接数（并行生成时同时进行的请求数）
+    retries: 建立连接失败时的重试次数；请求已发出后的读超时等错误不重试（POST 不是幂等的）
+    """
+
+    def __init__(self, pool_size=10, retries=3, backoff_factor=0.3):
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._sessions = {}
+        self._lock = threading.Lock()
+        # 已被淘汰的连接池的计数（连接池被关闭前累加到这里）
+        self._retired_connections = 0
+        self._retired_requests = 0
+
+    @staticmethod
+    def server_key(url):
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def _new_session(self):
+        retry = Retry(total=self.retries, connect=self.retries, read=0, status=0, other=0,
+                      backoff_factor=self.backoff_factor, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=retry)
+        # 连接池被淘汰时先累加它的计数，统计不丢失
+        adapter.poolmanager.pools.dispose_func = self._retire_pool
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _retire_pool(self, pool):
+        with self._lock:
+            self._retired_connections += pool.num_connections
+            self._retired_requests += pool.num_requests
+        pool.close()
+
+    def session_for(self, url):
+        key = self.server_key(url)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = self._new_session()
+            return session
+
+    def get(self, url, **kwargs):
+        return self.session_for(url).get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.session_for(url).post(url, **kwargs)
+
+    def read_event_stream(self, url, timeout=30, stop=None, deadline=None):
+        """
+        以流式 GET 逐行读取结果事件流，收到结束事件（event: complete / error，或 process_completed 消息）时立即返回
+        返回 (text, finished)：text 为已读到的原始内容（与普通 GET 的 r.text 格式相同），finished 表示已收到结束事件
+        不支持流式的服务器只返回当前状态，finished 为 False，调用方按原来的方式间隔后再次请求
+        timeout: 连接超时及两次收到数据之间的最长等待（秒）
+        stop: threading.Event，设置后在收到下一行（包括心跳）时停止读取，返回 finished 为 False
+        deadline: time.monotonic() 的截止时间；服务器一直发送心跳时 timeout 限制不住总时长，超过截止时间抛出 requests.Timeout
+        """
+        lines = []
+        event = None
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise requests.Timeout("等待生成结果超时")
+            # 没有新数据时读取超时也不超过截止时间
+            timeout = (timeout, min(timeout, remaining))
+        try:
+            with self.session_for(url).get(url, stream=True, timeout=timeout) as r:
+                r.raise_for_status()
+                if r.encoding is None:
+                    r.encoding = "utf-8"
+                for line in r.iter_lines(decode_unicode=True):
+                    if stop is not None and stop.is_set():
+                        break
+                    if deadline is not None and time.monotonic() >= deadline:
+                        raise requests.Timeout("等待生成结果超时")
+                    lines.append(line)
+                    if line.startswith("event:"):
+                        event = line[6:].strip()
+                    elif line.startswith("data:"):
+                        data = line[5:].strip()
+                        if event in TERMINAL_EVENTS or is_terminal_message(data):
+                            return "\n".join(lines), True
+                    elif line.startswith("{") and is_terminal_message(line):
+                        # 逐行 JSON 格式（没有 data: 前缀）
+                        return "\n".join(lines), True
+                    elif not line:
+                        event = None
+        except requests.ConnectionError:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise requests.Timeout("等待生成结果超时")
+            raise
+        return "\n".join(lines), False
+
+    def stats(self):
+        """返回 {"opened": 新建连接数, "requests": 请求数, "reused": 复用连接的请求数}"""
+        with self._lock:
+            opened = self._retired_connections
+            sent = self._retired_requests
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in list(pools.keys()):
+                    pool = pools.get(key)
+                    if pool is not None:
+                        opened += pool.num_connections
+                        sent += pool.num_requests
+        return {"opened": opened, "requests": sent, "reused": max(0, sent - opened)}
+
+    def close(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()